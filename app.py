@@ -2,11 +2,27 @@
 Hemp Industry Economic Impact Dashboard
 A data-driven resource for stakeholders and policymakers
 """
+import hmac
+import logging
+import os
+import time
+
+script_started = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-from google.cloud import bigquery
-from google.oauth2 import service_account
+
+import caching
+import figures
+import governor
+import headless
+import resilience
+import telemetry
+import timeline
+import warehouse
+
+logger = logging.getLogger(__name__)
+telemetry.configure_logging()
 
 # Page config
 st.set_page_config(
@@ -113,6 +129,18 @@ st.markdown("""
         margin-top: 12px;
     }
 
+    /* Shown while some data comes from a fallback */
+    .freshness-banner {
+        background: rgba(251, 191, 36, 0.08);
+        border: 1px solid rgba(251, 191, 36, 0.3);
+        border-radius: 12px;
+        color: #fbbf24;
+        font-size: 0.85rem;
+        padding: 12px 20px;
+        margin-bottom: 24px;
+        text-align: center;
+    }
+
     /* Hide Streamlit branding */
     #MainMenu {visibility: hidden;}
     footer {visibility: hidden;}
@@ -240,31 +268,77 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Initialize BigQuery client
 @st.cache_resource
-def get_bq_client():
-    credentials = service_account.Credentials.from_service_account_info(
-        dict(st.secrets["gcp_service_account"])
-    )
-    return bigquery.Client(credentials=credentials, project="artful-logic-475116-p1")
+def get_backend():
+    return headless.make_backend()
+
+@st.cache_resource
+def get_shared_cache():
+    return caching.shared_cache()
+
+# Local disk (or memory) tier over the cross-instance tier, when HEMP_SHARED_CACHE is set
+@st.cache_resource
+def get_query_cache():
+    return caching.tiered_cache(get_shared_cache())
 
-@st.cache_data(ttl=3600)
-def load_data(query):
-    client = get_bq_client()
-    return client.query(query).to_dataframe()
+@st.cache_resource
+def get_change_tracker():
+    return caching.ChangeTracker()
 
-@st.cache_data(ttl=3600)
+# Re-running is cheap: unchanged tables are served from the disk cache after a metadata check.
+# Held as a resource, not cache_data, so sessions share one compact copy instead of unpickling their own
+@st.cache_resource(ttl=caching.REVALIDATE_SECONDS)
 def load_all_data():
-    data = {}
-    data['production'] = load_data("SELECT * FROM `artful-logic-475116-p1.hemp_advocacy.production_by_state` ORDER BY year, hemp_type")
-    data['market'] = load_data("SELECT * FROM `artful-logic-475116-p1.hemp_advocacy.market_metrics` ORDER BY year")
-    data['employment'] = load_data("SELECT * FROM `artful-logic-475116-p1.hemp_advocacy.employment_stats` ORDER BY year")
-    data['regulatory'] = load_data("SELECT * FROM `artful-logic-475116-p1.hemp_advocacy.regulatory_status` ORDER BY state")
-    data['tax'] = load_data("SELECT * FROM `artful-logic-475116-p1.hemp_advocacy.tax_revenue` ORDER BY year, state")
-    data['timeline'] = load_data("SELECT * FROM `artful-logic-475116-p1.hemp_advocacy.industry_timeline` ORDER BY event_date")
-    return data
+    return caching.SharedFrames(caching.cached_dashboard(get_backend(), get_query_cache(), get_change_tracker()))
 
-data = load_all_data()
+@st.cache_resource
+def get_dashboard_refresher():
+    # Resolve shared resources here, on the script thread, not in the refresh worker
+    backend, cache, tracker = get_backend(), get_query_cache(), get_change_tracker()
+    return caching.StaleWhileRevalidate(lambda: caching.SharedFrames(caching.cached_dashboard(backend, cache, tracker)))
+
+@st.cache_data(ttl=caching.REVALIDATE_SECONDS)
+def fetch_summary():
+    return caching.cached_summary(get_backend(), get_query_cache(), get_change_tracker())
+
+@st.cache_resource
+def get_summary_refresher():
+    backend, cache, tracker = get_backend(), get_query_cache(), get_change_tracker()
+    return caching.StaleWhileRevalidate(lambda: caching.cached_summary(backend, cache, tracker))
+
+def load_summary():
+    """Headline scalars; in background mode a stale copy is served while a worker refreshes it"""
+    if caching.REFRESH_MODE == "background":
+        summary, _ = get_summary_refresher().get()
+        return summary
+    return fetch_summary()
+
+def fmt_usd(value):
+    if value is None:
+        return "—"
+    if value >= 1e9:
+        return f"${value / 1e9:.1f}B"
+    return f"${value / 1e6:.0f}M"
+
+def fmt_thousands(value, decimals=0, suffix=""):
+    return "—" if value is None else f"{value / 1000:.{decimals}f}K{suffix}"
+
+def fmt_growth(current, prior):
+    if current is None or not prior:
+        return ""
+    return f"↑ {(current / prior - 1) * 100:.0f}% YoY"
+
+def fmt_pct(value):
+    return "—" if value is None else f"{value:g}%"
+
+def fmt_year(value):
+    return "" if value is None else f" ({value:.0f})"
+
+@st.cache_resource
+def get_figure_cache():
+    return figures.FigureCache(get_shared_cache())
+
+figure_cache = get_figure_cache()
 
 # Dark theme for plotly
 dark_template = dict(
@@ -278,8 +352,13 @@ dark_template = dict(
     )
 )
 
+# Each section below is a fragment: a widget inside one reruns only that section,
+# not the whole script. Sections below the fold sit in expanders that only run
+# their content once opened (on_change="rerun" makes the open state available).
+
 # HEADER
-st.markdown("""
+def header():
+    st.markdown("""
 <div style="text-align: center; padding: 40px 0 50px 0;">
     <p style="color: #10b981; font-size: 0.85rem; letter-spacing: 3px; text-transform: uppercase; margin-bottom: 16px;">Economic Impact Report</p>
     <h1 style="color: #f3f4f6; font-size: 3rem; font-weight: 700; margin-bottom: 16px; line-height: 1.2;">
@@ -291,382 +370,213 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# DATA FRESHNESS - shown while the warehouse is out of reach and some data comes from a fallback
+def freshness_banner():
+    fallbacks = caching.fallback_log.status().values()
+    if not fallbacks:
+        return
+    sources = []
+    saved = [entry['saved_at'] for entry in fallbacks if entry['source'] == 'cache']
+    if saved:
+        sources.append(f"the last saved copy from {time.strftime('%b %d, %H:%M UTC', time.gmtime(min(saved)))}")
+    if any(entry['source'] == 'seed' for entry in fallbacks):
+        sources.append("built-in reference data from November 2025")
+    st.markdown(
+        f"<div class='freshness-banner'>⚠ Live data is temporarily unavailable. Showing {' and '.join(sources)}.</div>",
+        unsafe_allow_html=True,
+    )
+
 # HERO METRICS
-col1, col2, col3, col4 = st.columns(4)
-with col1:
-    st.markdown('<div class="metric-card"><div class="metric-value">$445M</div><div class="metric-label">Production Value</div><div class="metric-change">↑ 40% YoY</div></div>', unsafe_allow_html=True)
-with col2:
-    st.markdown('<div class="metric-card"><div class="metric-value">440K+</div><div class="metric-label">Jobs Created</div><div class="metric-change">↑ 5.4% YoY</div></div>', unsafe_allow_html=True)
-with col3:
-    st.markdown('<div class="metric-card"><div class="metric-value">$4.4B</div><div class="metric-label">Tax Revenue</div><div class="metric-change">2024 Total</div></div>', unsafe_allow_html=True)
-with col4:
-    st.markdown('<div class="metric-card"><div class="metric-value">45.3K</div><div class="metric-label">Acres Planted</div><div class="metric-change">↑ 64% YoY</div></div>', unsafe_allow_html=True)
-
-st.markdown("<p class='source-citation' style='text-align:center; margin-top: 24px;'>Sources: USDA NASS 2025, Vangst Jobs Report, MPP Tax Revenue Analysis</p>", unsafe_allow_html=True)
+def hero_metrics(summary):
+    hero_cards = [
+        (fmt_usd(summary['production_value_usd']), "Production Value",
+         fmt_growth(summary['production_value_usd'], summary['production_value_prior_usd'])),
+        (fmt_thousands(summary['total_jobs'], suffix="+"), "Jobs Created",
+         "" if summary['job_growth_pct'] is None else f"↑ {summary['job_growth_pct']:g}% YoY"),
+        (fmt_usd(summary['tax_revenue_usd']), "Tax Revenue",
+         "" if summary['tax_year'] is None else f"{summary['tax_year']:.0f} Total"),
+        (fmt_thousands(summary['planted_acres'], decimals=1), "Acres Planted",
+         fmt_growth(summary['planted_acres'], summary['planted_acres_prior'])),
+    ]
+    for col, (value, label, change) in zip(st.columns(4), hero_cards):
+        with col:
+            st.markdown(f'<div class="metric-card"><div class="metric-value">{value}</div><div class="metric-label">{label}</div><div class="metric-change">{change}</div></div>', unsafe_allow_html=True)
+
+    st.markdown("<p class='source-citation' style='text-align:center; margin-top: 24px;'>Sources: USDA NASS 2025, Vangst Jobs Report, MPP Tax Revenue Analysis</p>", unsafe_allow_html=True)
 
 # MARKET GROWTH - Sankey for Value Flow
-st.markdown("<div class='section-header'>Market Value Flow</div>", unsafe_allow_html=True)
-
-# Sankey diagram showing dollar value flow through the industry
-fig_sankey = go.Figure(data=[go.Sankey(
-    node=dict(
-        pad=20,
-        thickness=25,
-        line=dict(color='rgba(255,255,255,0.1)', width=1),
-        label=[
-            'Hemp Production<br>$445M',
-            'Processing &<br>Manufacturing',
-            'CBD Products<br>$180M',
-            'THC Beverages<br>$120M',
-            'Fiber/Grain<br>$145M',
-            'Wholesale &<br>Distribution',
-            'Retail Sales<br>$1.8B'
-        ],
-        color=['#047857', '#059669', '#10b981', '#34d399', '#6ee7b7',
-               '#10b981', '#34d399'],
-        x=[0.0, 0.25, 0.5, 0.5, 0.5, 0.75, 1.0],
-        y=[0.5, 0.5, 0.15, 0.5, 0.85, 0.5, 0.5]
-    ),
-    link=dict(
-        source=[0, 1, 1, 1, 2, 3, 4, 5],
-        target=[1, 2, 3, 4, 5, 5, 5, 6],
-        value=[445, 180, 120, 145, 540, 360, 435, 1800],
-        color=['rgba(16,185,129,0.3)', 'rgba(52,211,153,0.3)', 'rgba(110,231,183,0.3)',
-               'rgba(167,243,208,0.3)', 'rgba(16,185,129,0.25)', 'rgba(52,211,153,0.25)',
-               'rgba(110,231,183,0.25)', 'rgba(16,185,129,0.3)'],
-        hovertemplate='%{source.label} → %{target.label}<br>$%{value}M<extra></extra>'
-    )
-)])
-fig_sankey.update_layout(
-    title=dict(text="Hemp Industry Value Chain ($M)", font=dict(size=18, color='#f3f4f6')),
-    height=450,
-    paper_bgcolor='rgba(0,0,0,0)',
-    font=dict(color='#d1d5db', size=12, family='Space Grotesk'),
-    margin=dict(t=60, l=20, r=20, b=20)
-)
-st.plotly_chart(fig_sankey, use_container_width=True)
-
-col1, col2 = st.columns(2)
-
-with col1:
-    # Donut chart for market segments
-    fig_donut = go.Figure(data=[go.Pie(
-        labels=['CBD Products', 'THC Beverages', 'Fiber Products', 'Seed & Oil'],
-        values=[180, 120, 100, 45],
-        hole=0.6,
-        marker=dict(
-            colors=['#10b981', '#34d399', '#6ee7b7', '#a7f3d0'],
-            line=dict(color='#1a1a2e', width=2)
-        ),
-        textinfo='label+percent',
-        textposition='outside',
-        textfont=dict(color='#d1d5db', size=12),
-        hovertemplate='<b>%{label}</b><br>$%{value}M<br>%{percent}<extra></extra>'
-    )])
-    fig_donut.add_annotation(
-        text='<b>$445M</b><br>Total',
-        x=0.5, y=0.5,
-        font=dict(size=20, color='#10b981', family='Space Grotesk'),
-        showarrow=False
-    )
-    fig_donut.update_layout(
-        title=dict(text="Market Breakdown by Segment", font=dict(size=16, color='#f3f4f6')),
-        height=420,
-        paper_bgcolor='rgba(0,0,0,0)',
-        showlegend=False,
-        margin=dict(t=60, l=20, r=20, b=20)
-    )
-    st.plotly_chart(fig_donut, use_container_width=True)
-
-with col2:
-    # Area chart for market growth trajectory
-    years = [2023, 2024, 2025, 2026, 2027, 2028, 2029, 2030]
-    values = [1.8, 2.2, 2.7, 3.3, 4.0, 4.9, 6.0, 7.8]
-    fig_area = go.Figure()
-    fig_area.add_trace(go.Scatter(
-        x=years,
-        y=values,
-        mode='lines+markers+text',
-        fill='tozeroy',
-        fillcolor='rgba(16, 185, 129, 0.15)',
-        line=dict(color='#10b981', width=3),
-        marker=dict(size=10, color='#10b981', line=dict(width=2, color='#0a0a0a')),
-        text=[f'${v}B' for v in values],
-        textposition='top center',
-        textfont=dict(color='#10b981', size=11),
-        hovertemplate='<b>%{x}</b><br>$%{y}B<extra></extra>'
-    ))
-    fig_area.update_layout(
-        title=dict(text="Market Growth Trajectory (21.1% CAGR)", font=dict(size=16, color='#f3f4f6')),
-        height=420,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(family='Space Grotesk', color='#9ca3af'),
-        xaxis=dict(
-            gridcolor='rgba(255,255,255,0.05)',
-            tickfont=dict(color='#9ca3af'),
-            dtick=1
-        ),
-        yaxis=dict(
-            gridcolor='rgba(255,255,255,0.05)',
-            tickfont=dict(color='#9ca3af'),
-            tickprefix='$',
-            ticksuffix='B',
-            range=[0, 9]
-        ),
-        margin=dict(t=60, l=60, r=20, b=40),
-        showlegend=False
-    )
-    st.plotly_chart(fig_area, use_container_width=True)
+@st.fragment
+def market_growth():
+    st.markdown("<div class='section-header'>Market Value Flow</div>", unsafe_allow_html=True)
+
+    fig_sankey = figure_cache.get('sankey', figures.sankey)
+    st.plotly_chart(fig_sankey, width="stretch")
+
+    col1, col2 = st.columns(2)
 
-st.markdown("<p class='source-citation'>Sources: USDA NASS, Grand View Research (21.1% CAGR), Industry Analysis</p>", unsafe_allow_html=True)
+    with col1:
+        fig_donut = figure_cache.get('donut', figures.donut)
+        st.plotly_chart(fig_donut, width="stretch")
+
+    with col2:
+        fig_area = figure_cache.get('growth_area', figures.growth_area)
+        st.plotly_chart(fig_area, width="stretch")
+
+    st.markdown("<p class='source-citation'>Sources: USDA NASS, Grand View Research (21.1% CAGR), Industry Analysis</p>", unsafe_allow_html=True)
 
 # REGULATORY MAP
-st.markdown("<div class='section-header'>Regulatory Landscape</div>", unsafe_allow_html=True)
-status_counts = data['regulatory']['thc_beverage_status'].value_counts()
-col1, col2, col3 = st.columns([1, 2.5, 1])
-
-with col1:
-    st.markdown("#### By Status")
-    status_colors = {
-        'legal': '#10b981',
-        'legal_restricted': '#34d399',
-        'pending': '#fbbf24',
-        'dispensary_only': '#f97316',
-        'banned': '#ef4444'
-    }
-    for status, count in status_counts.items():
-        color = status_colors.get(status, '#6b7280')
-        label = status.replace('_', ' ').title()
-        st.markdown(f'''
+@st.fragment
+def regulatory_landscape(regulatory, summary):
+    st.markdown("<div class='section-header'>Regulatory Landscape</div>", unsafe_allow_html=True)
+    status_counts = regulatory['thc_beverage_status'].value_counts()
+    col1, col2, col3 = st.columns([1, 2.5, 1])
+
+    with col1:
+        st.markdown("#### By Status")
+        status_colors = {
+            'legal': '#10b981',
+            'legal_restricted': '#34d399',
+            'pending': '#fbbf24',
+            'dispensary_only': '#f97316',
+            'banned': '#ef4444'
+        }
+        for status, count in status_counts.items():
+            color = status_colors.get(status, '#6b7280')
+            label = status.replace('_', ' ').title()
+            st.markdown(f'''
         <div class="status-item">
             <div class="status-dot" style="background: {color};"></div>
             <span class="status-text"><span class="status-count">{count}</span> — {label}</span>
         </div>
         ''', unsafe_allow_html=True)
 
-with col2:
-    reg_df = data['regulatory'].copy()
-    status_map = {'legal': 4, 'legal_restricted': 3, 'pending': 2, 'dispensary_only': 1, 'banned': 0}
-    reg_df['status_num'] = reg_df['thc_beverage_status'].map(status_map)
-    fig = go.Figure(data=go.Choropleth(
-        locations=reg_df['state'],
-        z=reg_df['status_num'],
-        locationmode='USA-states',
-        colorscale=[
-            [0, '#ef4444'],
-            [0.25, '#f97316'],
-            [0.5, '#fbbf24'],
-            [0.75, '#34d399'],
-            [1, '#10b981']
-        ],
-        showscale=False,
-        hovertemplate="<b>%{location}</b><br>%{text}<extra></extra>",
-        text=reg_df['thc_beverage_status'].str.replace('_', ' ').str.title(),
-        marker_line_color='#1a1a2e',
-        marker_line_width=1
-    ))
-    fig.update_layout(
-        geo=dict(
-            scope='usa',
-            projection=dict(type='albers usa'),
-            showlakes=False,
-            bgcolor='rgba(0,0,0,0)',
-            landcolor='rgba(255,255,255,0.02)',
-        ),
-        margin=dict(l=0, r=0, t=0, b=0),
-        height=420,
-        paper_bgcolor='rgba(0,0,0,0)',
-    )
-    st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        fig = figure_cache.get('regulatory_map', figures.regulatory_map, regulatory)
+        st.plotly_chart(fig, width="stretch")
 
-with col3:
-    st.markdown('''
+    with col3:
+        states_legal = "—" if summary['states_legal'] is None else f"{summary['states_legal']:.0f}"
+        min_age = "—" if summary['min_age'] is None else f"{summary['min_age']:.0f}"
+        st.markdown(f'''
     <div class="obs-card">
         <h3>Key Stats</h3>
         <ul>
-            <li><strong>28</strong> states legal</li>
-            <li><strong>21+</strong> age required</li>
+            <li><strong>{states_legal}</strong> states legal</li>
+            <li><strong>{min_age}+</strong> age required</li>
             <li><strong>5-10mg</strong> THC limits</li>
             <li><strong>27+</strong> active bills</li>
         </ul>
     </div>
     ''', unsafe_allow_html=True)
 
-st.markdown("<p class='source-citation'>Source: MultiState Insider, Vicente LLP (Nov 2025)</p>", unsafe_allow_html=True)
+    st.markdown("<p class='source-citation'>Source: MultiState Insider, Vicente LLP (Nov 2025)</p>", unsafe_allow_html=True)
 
 # JOBS & TAX
-st.markdown("<div class='section-header'>Economic Contribution</div>", unsafe_allow_html=True)
-col1, col2 = st.columns(2)
-
-with col1:
-    # Gauge + Funnel combo for employment
-    emp_us = data['employment'][data['employment']['geography'] == 'US'].copy()
-    fig_funnel = go.Figure(go.Funnel(
-        y=['Total Industry', 'Direct Employment', 'Cannabis Sector', 'Hemp-Specific', 'New Hires 2024'],
-        x=[440000, 320000, 280000, 160000, 23760],
-        textposition='inside',
-        textinfo='value+percent initial',
-        opacity=0.85,
-        marker=dict(
-            color=['#059669', '#10b981', '#34d399', '#6ee7b7', '#a7f3d0'],
-            line=dict(width=2, color='#1a1a2e')
-        ),
-        connector=dict(line=dict(color='rgba(255,255,255,0.1)', width=2))
-    ))
-    fig_funnel.update_layout(
-        title=dict(text="Employment Funnel (440K+ Jobs)", font=dict(size=16, color='#f3f4f6')),
-        height=400,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(color='#d1d5db', family='Space Grotesk'),
-        margin=dict(t=60, l=10, r=10, b=10)
-    )
-    st.plotly_chart(fig_funnel, use_container_width=True)
-
-with col2:
-    # Treemap for state tax revenue
-    tax_states = data['tax'][(data['tax']['state'] != 'US') & (data['tax']['year'] == 2023) & (data['tax']['quarter'] == 4)].nlargest(10, 'tax_revenue_usd')
-    fig_tree = go.Figure(go.Treemap(
-        labels=tax_states['state'].tolist() + ['Other States'],
-        parents=[''] * len(tax_states) + [''],
-        values=tax_states['tax_revenue_usd'].tolist() + [500_000_000],
-        textinfo='label+value',
-        texttemplate='<b>%{label}</b><br>$%{value:,.0f}',
-        marker=dict(
-            colors=['#047857', '#059669', '#10b981', '#34d399', '#6ee7b7',
-                    '#a7f3d0', '#d1fae5', '#ecfdf5', '#f0fdf4', '#fafafa', '#4b5563'],
-            line=dict(width=2, color='#1a1a2e')
-        ),
-        textfont=dict(size=12),
-        hovertemplate='<b>%{label}</b><br>Tax Revenue: $%{value:,.0f}<extra></extra>'
-    ))
-    fig_tree.update_layout(
-        title=dict(text="State Tax Revenue Treemap", font=dict(size=16, color='#f3f4f6')),
-        height=400,
-        paper_bgcolor='rgba(0,0,0,0)',
-        margin=dict(t=60, l=10, r=10, b=10),
-        font=dict(family='Space Grotesk')
-    )
-    st.plotly_chart(fig_tree, use_container_width=True)
+@st.fragment
+def economic_contribution(tax_states):
+    st.markdown("<div class='section-header'>Economic Contribution</div>", unsafe_allow_html=True)
+    col1, col2 = st.columns(2)
 
-st.markdown("<p class='source-citation'>Sources: Vangst 2024, U.S. Census Bureau, MPP Analysis</p>", unsafe_allow_html=True)
+    with col1:
+        # Gauge + Funnel combo for employment; stages are curated, not queried
+        fig_funnel = figure_cache.get('employment_funnel', figures.employment_funnel)
+        st.plotly_chart(fig_funnel, width="stretch")
 
-# CONSUMER DEMAND - Radar Chart for Demographics
-st.markdown("<div class='section-header'>Consumer Demand</div>", unsafe_allow_html=True)
-col1, col2 = st.columns([1.2, 1])
-
-with col1:
-    # Radar chart for consumer segment analysis
-    categories = ['Awareness', 'Purchase Intent', 'Price Premium', 'Brand Loyalty', 'Repeat Purchase', 'Social Share']
-    fig_radar = go.Figure()
-
-    fig_radar.add_trace(go.Scatterpolar(
-        r=[85, 72, 70, 65, 78, 82],
-        theta=categories,
-        fill='toself',
-        fillcolor='rgba(16, 185, 129, 0.2)',
-        line=dict(color='#10b981', width=2),
-        name='Gen Z (18-25)'
-    ))
-    fig_radar.add_trace(go.Scatterpolar(
-        r=[78, 68, 65, 70, 72, 68],
-        theta=categories,
-        fill='toself',
-        fillcolor='rgba(52, 211, 153, 0.15)',
-        line=dict(color='#34d399', width=2),
-        name='Millennials (26-41)'
-    ))
-    fig_radar.add_trace(go.Scatterpolar(
-        r=[64, 45, 48, 55, 58, 35],
-        theta=categories,
-        fill='toself',
-        fillcolor='rgba(110, 231, 183, 0.1)',
-        line=dict(color='#6ee7b7', width=2),
-        name='Gen X (42-57)'
-    ))
-
-    fig_radar.update_layout(
-        title=dict(text="Consumer Segment Analysis", font=dict(size=16, color='#f3f4f6')),
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                range=[0, 100],
-                gridcolor='rgba(255,255,255,0.1)',
-                tickfont=dict(color='#6b7280', size=10)
-            ),
-            angularaxis=dict(
-                gridcolor='rgba(255,255,255,0.1)',
-                tickfont=dict(color='#9ca3af', size=11)
-            ),
-            bgcolor='rgba(0,0,0,0)'
-        ),
-        showlegend=True,
-        legend=dict(
-            orientation='h',
-            yanchor='bottom',
-            y=-0.15,
-            xanchor='center',
-            x=0.5,
-            font=dict(color='#9ca3af', size=11)
-        ),
-        height=420,
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(family='Space Grotesk'),
-        margin=dict(t=60, l=60, r=60, b=80)
-    )
-    st.plotly_chart(fig_radar, use_container_width=True)
+    with col2:
+        # Treemap for state tax revenue
+        # Top 10 states for Q4 2023, filtered and ranked in SQL (see warehouse.CHART_QUERIES)
+        fig_tree = figure_cache.get('tax_treemap', figures.tax_treemap, tax_states)
+        st.plotly_chart(fig_tree, width="stretch")
 
-with col2:
-    st.markdown("""
+    st.markdown("<p class='source-citation'>Sources: Vangst 2024, U.S. Census Bureau, MPP Analysis</p>", unsafe_allow_html=True)
+
+# CONSUMER DEMAND - Radar Chart for Demographics
+@st.fragment
+def consumer_demand(summary):
+    st.markdown("<div class='section-header'>Consumer Demand</div>", unsafe_allow_html=True)
+    section = st.expander("Show consumer demand", key=headless.CONSUMER_SECTION, on_change="rerun")
+    if not section.open:
+        return
+    with section:
+        col1, col2 = st.columns([1.2, 1])
+
+        with col1:
+            fig_radar = figure_cache.get('consumer_radar', figures.consumer_radar)
+            st.plotly_chart(fig_radar, width="stretch")
+
+        with col2:
+            growth_year = "" if summary['beverage_growth_year'] is None else f" in {summary['beverage_growth_year']:.0f}"
+            st.markdown(f"""
     <div style="padding: 20px;">
         <div class="stat-card" style="margin-bottom: 20px;">
-            <div class="stat-value" style="font-size: 2.8rem;">64%</div>
+            <div class="stat-value" style="font-size: 2.8rem;">{fmt_pct(summary['awareness_pct'])}</div>
             <div class="stat-label">of Americans familiar<br/>with CBD products</div>
         </div>
         <div class="stat-card" style="margin-bottom: 20px;">
-            <div class="stat-value" style="font-size: 2.8rem;">36.5%</div>
-            <div class="stat-label">CBD beverage sales<br/>growth in 2023</div>
+            <div class="stat-value" style="font-size: 2.8rem;">{fmt_pct(summary['beverage_growth_pct'])}</div>
+            <div class="stat-label">CBD beverage sales<br/>growth{growth_year}</div>
         </div>
         <div class="stat-card">
-            <div class="stat-value" style="font-size: 2.8rem;">70%</div>
+            <div class="stat-value" style="font-size: 2.8rem;">{fmt_pct(summary['premium_pct'])}</div>
             <div class="stat-label">Gen Z/Millennials pay<br/>premium for traceable</div>
         </div>
     </div>
     """, unsafe_allow_html=True)
 
-st.markdown("<p class='source-citation' style='margin-top: 24px;'>Sources: Mastermind Behavior, Euromonitor, Industry Surveys 2024</p>", unsafe_allow_html=True)
+        st.markdown("<p class='source-citation' style='margin-top: 24px;'>Sources: Mastermind Behavior, Euromonitor, Industry Surveys 2024</p>", unsafe_allow_html=True)
 
 # TIMELINE
-st.markdown("<div class='section-header'>Industry Timeline</div>", unsafe_allow_html=True)
-timeline_df = data['timeline'].sort_values('event_date')
-for _, row in timeline_df.iterrows():
-    impact_color = {'positive': '#10b981', 'negative': '#ef4444', 'neutral': '#6b7280'}.get(row['impact'], '#6b7280')
-    st.markdown(f'''
-    <div class="timeline-item" style="border-left: 3px solid {impact_color};">
-        <div class="timeline-date">{row["event_date"].strftime("%b %Y")}</div>
-        <div>
-            <div class="timeline-title">{row["title"]}</div>
-            <div class="timeline-desc">{row["description"]}</div>
-        </div>
-    </div>
-    ''', unsafe_allow_html=True)
+@st.fragment
+def industry_timeline(timeline_df):
+    st.markdown("<div class='section-header'>Industry Timeline</div>", unsafe_allow_html=True)
+    section = st.expander("Show timeline", key=headless.TIMELINE_SECTION, on_change="rerun")
+    if not section.open:
+        return
+    with section:
+        col1, col2, col3 = st.columns([1, 1, 2])
+        event_dates = pd.to_datetime(timeline_df['event_date'])
+        with col1:
+            event_types = st.multiselect("Event type", sorted(timeline_df['event_type'].dropna().unique()), key="timeline_types")
+        with col2:
+            impacts = st.multiselect("Impact", sorted(timeline_df['impact'].dropna().unique()), key="timeline_impacts")
+        with col3:
+            first_year, last_year = (event_dates.min().year, event_dates.max().year) if len(timeline_df) else (2018, 2025)
+            # A slider needs two distinct bounds
+            last_year = max(last_year, first_year + 1)
+            years = st.slider("Years", first_year, last_year, (first_year, last_year), key="timeline_years")
+        events = timeline.filter_events(
+            timeline_df, event_types, impacts, start=f"{years[0]}-01-01", end=f"{years[1]}-12-31"
+        )
+        pages = timeline.page_count(events)
+        page_number = st.number_input("Page", 1, pages, 1, key="timeline_page") if pages > 1 else 1
+        st.markdown(timeline.render_html(timeline.page(events, page_number)), unsafe_allow_html=True)
 
 # KEY TAKEAWAYS
-st.markdown("<div class='section-header'>Key Takeaways</div>", unsafe_allow_html=True)
-col1, col2 = st.columns(2)
-with col1:
-    st.markdown("""
+@st.fragment
+def key_takeaways(summary):
+    st.markdown("<div class='section-header'>Key Takeaways</div>", unsafe_allow_html=True)
+    section = st.expander("Show key takeaways", key=headless.TAKEAWAYS_SECTION, on_change="rerun")
+    if not section.open:
+        return
+    with section:
+        # The same summary figures as the hero cards and Key Stats, so the page agrees with itself
+        production_growth = "—"
+        if summary['production_value_usd'] is not None and summary['production_value_prior_usd']:
+            production_growth = f"{(summary['production_value_usd'] / summary['production_value_prior_usd'] - 1) * 100:.0f}%"
+        acres = "—" if summary['planted_acres'] is None else f"{summary['planted_acres']:,.0f}"
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown(f"""
 <div class="key-section">
 
 ### Economic Impact
-- **$445M** U.S. hemp production value (2024)
-- **$4.4B** state tax revenue generated
-- **440K+** jobs across the industry
-- **40%+** annual production growth
+- **{fmt_usd(summary['production_value_usd'])}** U.S. hemp production value{fmt_year(summary['production_year'])}
+- **{fmt_usd(summary['tax_revenue_usd'])}** state tax revenue generated{fmt_year(summary['tax_year'])}
+- **{fmt_thousands(summary['total_jobs'], suffix="+")}** jobs across the industry
+- **{production_growth}** annual production value growth
 
 ### Agricultural Benefits
-- **45,294** acres under cultivation
+- **{acres}** acres under cultivation
 - **8,153** farming operations
 - Rural economic diversification
 - Federal crop insurance eligible
@@ -674,15 +584,21 @@ with col1:
 </div>
 """, unsafe_allow_html=True)
 
-with col2:
-    st.markdown("""
+        with col2:
+            states_legal = "—" if summary['states_legal'] is None else f"{summary['states_legal']:.0f}"
+            if summary['min_age'] is None:
+                age_rule = "Age restrictions vary"
+            else:
+                scope = "Universal" if summary['min_age'] == summary['max_age'] else "Minimum"
+                age_rule = f"{scope} {summary['min_age']:.0f}+ age restriction"
+            st.markdown(f"""
 <div class="key-section">
 
 ### Consumer Choice
-- **28 states** with legal THC beverages
+- **{states_legal} states** with legal THC beverages
 - Strong demand & awareness
 - Preference for regulated products
-- Universal 21+ age restriction
+- {age_rule}
 
 ### Regulatory Landscape
 - Responsible state frameworks emerging
@@ -694,8 +610,9 @@ with col2:
 """, unsafe_allow_html=True)
 
 # FOOTER
-st.markdown("---")
-st.markdown('''
+def footer(data_age):
+    st.markdown("---")
+    st.markdown('''
 <div style="text-align: center; color: #4b5563; padding: 30px 0;">
     <p style="font-size: 0.75rem; margin-bottom: 8px;">
         <strong style="color: #6b7280;">Data Sources:</strong> USDA NASS • Census Bureau • Vangst • Grand View Research • MultiState • Vicente LLP
@@ -705,3 +622,164 @@ st.markdown('''
     </p>
 </div>
 ''', unsafe_allow_html=True)
+    if data_age is not None:
+        data_age_note(data_age)
+
+def data_age_note(data_age):
+    st.markdown(f"<p class='source-citation' style='text-align:center;'>Data loaded {data_age / 60:.0f} min ago</p>", unsafe_allow_html=True)
+
+# DIAGNOSTICS - admin only, shown when the page is opened with ?diagnostics=<HEMP_ADMIN_TOKEN>
+ADMIN_TOKEN = os.environ.get("HEMP_ADMIN_TOKEN")
+
+def is_admin():
+    supplied = st.query_params.get("diagnostics")
+    # Compared as bytes: compare_digest rejects non-ASCII str
+    return bool(ADMIN_TOKEN and supplied) and hmac.compare_digest(supplied.encode(), ADMIN_TOKEN.encode())
+
+@st.fragment
+def diagnostics():
+    st.markdown("<div class='section-header'>Diagnostics</div>", unsafe_allow_html=True)
+    # Clicking reruns just this fragment, picking up queries recorded since
+    st.button("Refresh", key="diagnostics_refresh")
+    query_summary = telemetry.query_log.summary()
+    if query_summary.empty:
+        # Expected when every table was served from a cache tier
+        st.caption("No queries recorded by this process yet.")
+    else:
+        st.markdown("#### Queries by label (p50 / p95)")
+        st.dataframe(query_summary, width="stretch")
+        st.markdown("#### Recent queries")
+        st.dataframe(telemetry.query_log.frame().iloc[::-1].head(50), width="stretch", hide_index=True)
+    st.json({
+        'single_flight': caching.single_flight.stats(),
+        'cache_tiers': get_query_cache().stats(),
+        'governor': governor.query_governor.stats(),
+        'circuit': {'queries': resilience.breaker.stats(), 'metadata': resilience.metadata_breaker.stats()},
+        'fallbacks': caching.fallback_log.status(),
+        'figure_cache': figure_cache.stats(),
+        'paint_times': st.session_state.get('paint_times'),
+        'data_access': st.session_state.get('data_access'),
+        'startup': telemetry.startup,
+    })
+
+# 'progressive' paints the static sections first and fills in data-driven
+# sections as their queries finish; 'blocking' loads everything up front
+RENDER_MODE = os.environ.get("HEMP_RENDER_MODE", "progressive")
+
+def placeholder(title=None):
+    """Slot for a section, showing a loading note until its data arrives"""
+    slot = st.empty()
+    heading = f"<div class='section-header'>{title}</div>" if title else ""
+    slot.markdown(f"{heading}<p class='source-citation' style='text-align:center;'>Loading…</p>", unsafe_allow_html=True)
+    return slot
+
+def refresher_stream(refresher):
+    """Cold start: yield chart data as each query lands, then hand it to the refresher"""
+    data = {}
+    for name, df in caching.iter_dashboard(get_backend(), get_query_cache(), get_change_tracker()):
+        data[name] = df
+        yield name, df
+    refresher.swap(caching.SharedFrames(data))
+
+def dashboard_views():
+    """This session's zero-copy views of the shared dashboard tables, and their age in seconds"""
+    started = time.perf_counter()
+    if caching.REFRESH_MODE == "background":
+        shared, data_age = get_dashboard_refresher().get()
+    else:
+        shared, data_age = load_all_data(), None
+    data = shared.views()
+    st.session_state['data_access'] = {'seconds': time.perf_counter() - started, **shared.stats()}
+    return data, data_age
+
+def chart_data_stream():
+    """Return ((name, dataframe) iterator in arrival order, age of the data in seconds)"""
+    if caching.REFRESH_MODE == "background" and get_dashboard_refresher().loaded_at is None:
+        return refresher_stream(get_dashboard_refresher()), 0.0
+    data, data_age = dashboard_views()
+    return iter(data.items()), data_age
+
+def report_paint_times(paint_times):
+    logger.info(
+        "First meaningful paint at %.0f ms (%s)",
+        paint_times['first_paint'] * 1000,
+        ", ".join(f"{event}={seconds * 1000:.0f}ms" for event, seconds in paint_times.items()),
+    )
+    st.session_state['paint_times'] = paint_times
+
+def render_progressive():
+    paint_times = {}
+    def mark(event):
+        paint_times[event] = time.perf_counter() - script_started
+
+    header()
+    banner_slot = st.empty()
+    hero_slot = placeholder()
+    market_growth()
+    mark('first_paint')
+    slots = {
+        'regulatory': placeholder("Regulatory Landscape"),
+        'economic': placeholder("Economic Contribution"),
+        'consumer': placeholder("Consumer Demand"),
+        'timeline': placeholder("Industry Timeline"),
+        'takeaways': placeholder("Key Takeaways"),
+    }
+    footer(None)
+    age_slot = st.empty()
+
+    summary = load_summary()
+    with hero_slot.container():
+        hero_metrics(summary)
+    with slots.pop('consumer').container():
+        consumer_demand(summary)
+    with slots.pop('takeaways').container():
+        key_takeaways(summary)
+    mark('summary')
+
+    data = {}
+    sections = {
+        'regulatory': (('regulatory',), lambda: regulatory_landscape(data['regulatory'], summary)),
+        'economic': (('tax',), lambda: economic_contribution(data['tax'])),
+        'timeline': (('timeline',), lambda: industry_timeline(data['timeline'])),
+    }
+    stream, data_age = chart_data_stream()
+    for name, df in stream:
+        data[name] = df
+        for section, (needs, render) in list(sections.items()):
+            if all(need in data for need in needs):
+                with slots[section].container():
+                    render()
+                del sections[section]
+                mark(section)
+    if data_age is not None:
+        with age_slot.container():
+            data_age_note(data_age)
+    with banner_slot.container():
+        freshness_banner()
+    report_paint_times(paint_times)
+
+def render_blocking():
+    header()
+    banner_slot = st.empty()
+    summary = load_summary()
+    hero_metrics(summary)
+
+    # Chart data loads after the hero cards, which only need the summary query
+    data, data_age = dashboard_views()
+    with banner_slot.container():
+        freshness_banner()
+
+    market_growth()
+    regulatory_landscape(data['regulatory'], summary)
+    economic_contribution(data['tax'])
+    consumer_demand(summary)
+    industry_timeline(data['timeline'])
+    key_takeaways(summary)
+    footer(data_age)
+
+if RENDER_MODE == "progressive":
+    render_progressive()
+else:
+    render_blocking()
+if is_admin():
+    diagnostics()
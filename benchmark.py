@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for full-script reruns of the dashboard
+Runs app.py headlessly through Streamlit's AppTest against the local DuckDB
+backend, once per data scale, each in a fresh process so caches start cold and
+peak RSS belongs to that scale alone. Results are written as JSON; pass
+--baseline to fail when a metric regresses past --threshold.
+
+    python benchmark.py --scales 1 10 100 --output bench.json
+    python benchmark.py --baseline bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+
+# Extra sessions run to measure what each one holds beyond the shared caches
+SESSIONS = 5
+# Metrics compared against the baseline; all are lower-is-better
+TRACKED = ("cold_seconds", "warm_seconds", "peak_rss_mb", "alloc_peak_mb", "session_kb")
+
+
+def prepare_database(path, scale):
+    """DuckDB file holding the seed data, or synthetic data at scale times its size"""
+    import warehouse
+    from data import generate_data
+
+    backend = warehouse.LocalBackend(str(path))
+    if scale > 1:
+        for table in generate_data.BUILDERS:
+            backend.conn.execute(f"DELETE FROM {table}")
+        for table, chunk in generate_data.generate(scale):
+            backend.insert(table, chunk)
+    backend.conn.close()
+
+
+def app_test():
+    import headless
+
+    return headless.app_test(timeout=120)
+
+
+def timed_run(at):
+    import headless
+
+    started = time.perf_counter()
+    headless.run(at)
+    return time.perf_counter() - started
+
+
+def section_times(paint_times):
+    """Seconds spent on each section, from the cumulative marks app.py records"""
+    sections, previous = {}, 0.0
+    for event, at in sorted(paint_times.items(), key=lambda item: item[1]):
+        sections[event] = at - previous
+        previous = at
+    return sections
+
+
+def measure(scale, warm_runs):
+    """Run inside the child process: one cold run, warm reruns, a traced rerun, then extra sessions"""
+    at = app_test()
+    cold = timed_run(at)
+    sections = section_times(at.session_state['paint_times'])
+    warm = [timed_run(at) for _ in range(warm_runs)]
+    tracemalloc.start()
+    timed_run(at)
+    _, alloc_peak = tracemalloc.get_traced_memory()
+    alloc_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+    tracemalloc.stop()
+    data_access = at.session_state['data_access']
+
+    # Memory still held after new sessions' first runs, which hit the shared caches
+    sessions = [app_test() for _ in range(SESSIONS)]
+    tracemalloc.start()
+    for session in sessions:
+        timed_run(session)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'scale': scale,
+        'cold_seconds': cold,
+        'warm_seconds': statistics.median(warm),
+        'warm_seconds_max': max(warm),
+        'sections': sections,
+        # ru_maxrss is in KB on Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'alloc_peak_mb': alloc_peak / 1024 / 1024,
+        'alloc_blocks': alloc_blocks,
+        'session_kb': retained / SESSIONS / 1024,
+        'data_access_seconds': data_access['seconds'],
+        'shared_data_bytes': data_access['shared_bytes'],
+        'uncompacted_data_bytes': data_access['uncompacted_bytes'],
+    }
+
+
+def run_scale(scale, warm_runs):
+    """Benchmark one scale in a fresh process with its own database and cache dir"""
+    with tempfile.TemporaryDirectory() as workdir:
+        db = Path(workdir) / "hemp.duckdb"
+        env = {
+            **os.environ,
+            "HEMP_DATA_BACKEND": "local",
+            "HEMP_LOCAL_DB": str(db),
+            "HEMP_CACHE_DIR": str(Path(workdir) / "cache"),
+        }
+        subprocess.run([sys.executable, __file__, "--prepare", str(scale)], env=env, cwd=ROOT, check=True)
+        child = subprocess.run(
+            [sys.executable, __file__, "--measure", str(scale), "--warm-runs", str(warm_runs)],
+            env=env, cwd=ROOT, check=True, capture_output=True, text=True,
+        )
+    return json.loads(child.stdout.strip().splitlines()[-1])
+
+
+def regressions(results, baseline, threshold):
+    """(scale, metric, baseline, current) for every tracked metric worse than threshold"""
+    previous = {str(run['scale']): run for run in baseline['runs']}
+    found = []
+    for run in results['runs']:
+        before = previous.get(str(run['scale']))
+        if before is None:
+            continue
+        for metric in TRACKED:
+            if before.get(metric) and run[metric] > before[metric] * (1 + threshold):
+                found.append((run['scale'], metric, before[metric], run[metric]))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100],
+                        help="multiples of the seed data to benchmark (default: 1 10 100)")
+    parser.add_argument("--warm-runs", type=int, default=5, help="warm reruns per scale (default: 5)")
+    parser.add_argument("--output", default="bench_results.json", help="where to write results")
+    parser.add_argument("--baseline", help="earlier results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown/growth over the baseline (default: 0.2 = 20%%)")
+    parser.add_argument("--prepare", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--measure", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.prepare is not None:
+        sys.path.insert(0, str(ROOT))
+        prepare_database(os.environ["HEMP_LOCAL_DB"], args.prepare)
+        return 0
+    if args.measure is not None:
+        print(json.dumps(measure(args.measure, args.warm_runs)))
+        return 0
+
+    results = {
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        'python': platform.python_version(),
+        'runs': [],
+    }
+    print(f"{'scale':>7} {'cold s':>8} {'warm s':>8} {'rss MB':>8} {'alloc MB':>9} {'session KB':>11} {'data ms':>8}")
+    for scale in args.scales:
+        run = run_scale(scale, args.warm_runs)
+        results['runs'].append(run)
+        print(f"{scale:>7} {run['cold_seconds']:>8.2f} {run['warm_seconds']:>8.3f} "
+              f"{run['peak_rss_mb']:>8.0f} {run['alloc_peak_mb']:>9.1f} {run['session_kb']:>11.0f} "
+              f"{run['data_access_seconds'] * 1000:>8.2f}")
+    Path(args.output).write_text(json.dumps(results, indent=2))
+    print(f"Wrote {args.output}")
+
+    if args.baseline:
+        found = regressions(results, json.loads(Path(args.baseline).read_text()), args.threshold)
+        for scale, metric, before, now in found:
+            print(f"REGRESSION scale={scale} {metric}: {before:.3f} -> {now:.3f} (+{now / before - 1:.0%})")
+        if found:
+            return 1
+        print(f"No regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
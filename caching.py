@@ -0,0 +1,712 @@
+"""
+Persistent cache tiers that sit under the Streamlit in-memory caches
+"""
+import hashlib
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+import governor
+import resilience
+import warehouse
+
+logger = logging.getLogger(__name__)
+
+# Directory for Arrow IPC snapshots of query results; empty string disables the disk tier
+CACHE_DIR = os.environ.get("HEMP_CACHE_DIR", os.path.join(tempfile.gettempdir(), "hemp-advocacy-cache"))
+# Least recently read snapshots are evicted once the directory grows past this size
+CACHE_MAX_BYTES = int(os.environ.get("HEMP_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+# Bump to invalidate every snapshot, e.g. after reloading the warehouse
+DATA_VERSION = os.environ.get("HEMP_DATA_VERSION", "")
+# Cache tier shared by every instance: a directory all of them mount
+# ('file:///mnt/hemp-cache') or a Redis-compatible server ('redis://host:6379/0').
+# Empty disables it, leaving each instance to warm from the warehouse alone.
+SHARED_CACHE_URL = os.environ.get("HEMP_SHARED_CACHE", "")
+# Seconds an entry lives in the shared tier
+SHARED_CACHE_TTL = int(os.environ.get("HEMP_SHARED_CACHE_TTL", 24 * 3600))
+
+# How often load_all_data() re-runs to look for changed tables
+REVALIDATE_SECONDS = int(os.environ.get("HEMP_REVALIDATE_SECONDS", 300))
+# Seconds between metadata checks per dashboard table, following each source's
+# update cadence (see the Data Sources table in README.md)
+CHECK_INTERVALS = {
+    'production_by_state': 24 * 3600,  # USDA NASS, annual
+    'market_metrics': 24 * 3600,       # Grand View Research, periodic
+    'employment_stats': 24 * 3600,     # Vangst / Census, annual
+    'consumer_trends': 24 * 3600,      # Mastermind / Euromonitor, annual
+    'regulatory_status': 3600,         # MultiState / Vicente, quarterly but bills move fast
+    'tax_revenue': 6 * 3600,           # MPP, quarterly
+    'industry_timeline': 3600,         # edited by hand as events happen
+}
+DEFAULT_CHECK_INTERVAL = 3600
+# Seconds a metadata check may take, retries included; never longer than a query may
+CHECK_DEADLINE = min(10, warehouse.DEFAULT_QUERY_TIMEOUT)
+
+# 'background' serves the last good data while a worker thread refreshes it;
+# 'blocking' refreshes inside whichever request finds the cache expired
+REFRESH_MODE = os.environ.get("HEMP_REFRESH_MODE", "background")
+
+SUFFIX = ".arrow"
+# Per-key pointer to the newest version written, for serving stale data
+LATEST_SUFFIX = ".latest"
+
+# String columns with at most this share of distinct values become categoricals
+CATEGORY_RATIO = 0.5
+
+# SharedFrames hands every session views of the same frames; Copy-on-Write
+# (always on from pandas 3) makes a session's write copy instead of leaking
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+class DiskCache:
+    """Query results stored as Arrow IPC files, read back through a memory map.
+
+    Writes go to a temporary file in the same directory and are renamed into
+    place, so a crash mid-write never leaves a partial snapshot behind.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key, version):
+        return self.directory / f"{entry_name(key, version)}{SUFFIX}"
+
+    def get(self, key, version=DATA_VERSION):
+        path = self.path(key, version)
+        try:
+            stat = path.stat()
+            with pa.memory_map(str(path)) as source:
+                df = pa.ipc.open_file(source).read_all().to_pandas()
+            # Record the read in atime for LRU eviction, keeping mtime as the write time
+            os.utime(path, (time.time(), stat.st_mtime))
+        except FileNotFoundError:
+            return None
+        except (pa.ArrowInvalid, OSError):
+            logger.warning("Discarding unreadable cache file %s", path, exc_info=True)
+            path.unlink(missing_ok=True)
+            return None
+        return df
+
+    def put(self, key, df, version=DATA_VERSION):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+                sink.flush()
+                os.fsync(sink.fileno())
+            os.replace(tmp_path, self.path(key, version))
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self.point_latest(key, version)
+        self.evict()
+
+    def latest_path(self, key):
+        return self.directory / f"{entry_name(key, 'latest')}{LATEST_SUFFIX}"
+
+    def point_latest(self, key, version):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as sink:
+            sink.write(version)
+        os.replace(tmp_path, self.latest_path(key))
+
+    def latest(self, key):
+        """(dataframe, unix time written) for the newest snapshot of key in any version, or None"""
+        try:
+            version = self.latest_path(key).read_text()
+            written_at = self.path(key, version).stat().st_mtime
+        except FileNotFoundError:
+            return None
+        df = self.get(key, version)
+        return None if df is None else (df, written_at)
+
+    def evict(self):
+        """Drop least recently read snapshots until the directory fits in max_bytes"""
+        entries = []
+        for path in self.directory.iterdir():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.suffix == ".tmp" and time.time() - stat.st_mtime > 3600:
+                # Left behind by a writer that crashed before renaming
+                path.unlink(missing_ok=True)
+            elif path.suffix == SUFFIX:
+                entries.append((stat.st_atime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+class MemoryCache:
+    """In-process stand-in for DiskCache when HEMP_CACHE_DIR is empty; keeps one version per key"""
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key, version=DATA_VERSION):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        return entry[1]
+
+    def put(self, key, df, version=DATA_VERSION):
+        self.entries[key] = (version, df, time.time())
+
+    def latest(self, key):
+        entry = self.entries.get(key)
+        return None if entry is None else entry[1:]
+
+
+# Version of a table whose metadata hasn't been read yet
+UNKNOWN_VERSION = "unknown"
+
+
+class ChangeTracker:
+    """Remembers each table's last seen version and re-checks it on its own schedule.
+
+    Versions come from backend.table_versions(), which reads metadata rather
+    than table data, so a table that hasn't changed is never re-fetched.
+    """
+
+    def __init__(self, intervals=CHECK_INTERVALS):
+        self.intervals = intervals
+        self.versions = {}
+        self.checked_at = {}
+        self.lock = threading.Lock()
+
+    def due(self, tables, now):
+        return [
+            table for table in tables
+            if now - self.checked_at.get(table, float("-inf")) >= self.intervals.get(table, DEFAULT_CHECK_INTERVAL)
+        ]
+
+    def current(self, backend, tables):
+        """Version string per table, checking metadata only for tables that are due"""
+        tables = list(dict.fromkeys(tables))
+        with self.lock:
+            now = time.monotonic()
+            due = self.due(tables, now)
+            if due:
+                try:
+                    found = resilience.call(
+                        lambda remaining: backend.table_versions(due), CHECK_DEADLINE, breaker=resilience.metadata_breaker
+                    )
+                except resilience.WarehouseUnavailable as error:
+                    # Keep the last known versions; unknown tables miss the cache and fall back
+                    logger.warning("Could not check table versions, trying again next time: %s", error)
+                    found = {}
+                for table in due:
+                    if table not in found:
+                        continue
+                    if self.versions.get(table) not in (None, found[table]):
+                        logger.info("Table %s changed, version %s", table, found[table])
+                    self.versions[table] = found[table]
+                    self.checked_at[table] = now
+            return {table: f"{DATA_VERSION}:{self.versions.get(table, UNKNOWN_VERSION)}" for table in tables}
+
+
+def known(version):
+    """Whether a version from ChangeTracker.current() (or several joined) came from the table metadata"""
+    return UNKNOWN_VERSION not in version
+
+
+class SingleFlight:
+    """Concurrent callers asking for the same key share one in-flight call.
+
+    The first caller runs the function; everyone who arrives while it is
+    running waits for and receives the same result (or exception).
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self.lock:
+            call = self.in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self.in_flight[key] = {'done': threading.Event(), 'result': None, 'error': None}
+                self.executed += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call['done'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+        try:
+            call['result'] = fn()
+            return call['result']
+        except BaseException as error:
+            call['error'] = error
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            call['done'].set()
+
+    def stats(self):
+        with self.lock:
+            return {'executed': self.executed, 'coalesced': self.coalesced, 'in_flight': len(self.in_flight)}
+
+
+# Shared by every session in the process
+single_flight = SingleFlight()
+
+
+def cache_key(backend, query, params=None):
+    return f"{backend.name}\0{query}\0{sorted((params or {}).items())}"
+
+
+# Errors after which a query is answered from fallback data rather than failing the page
+FALLBACK_ERRORS = (governor.QueryRejected, resilience.WarehouseUnavailable)
+
+
+def fetch_query(backend, cache, query, params, version, label=None):
+    key = cache_key(backend, query, params)
+    try:
+        df, _ = warehouse.run_query(backend, query, params=params, label=label)
+    except FALLBACK_ERRORS as error:
+        return cached_fallback(cache, key, query, params, label or "query", error)
+    fallback_log.clear(label or "query")
+    cache.put(key, df, version)
+    return df
+
+
+def cached_fallback(cache, key, query, params, label, error):
+    """Data for a query the warehouse couldn't answer or the governor turned away.
+
+    The newest cached copy of its result in any version, or else the query
+    run against the seed data compiled into data/seed_data.py
+    """
+    found = cache.latest(key)
+    if found is not None:
+        df, saved_at = found
+        fallback_log.note(label, 'cache', saved_at, error)
+        logger.warning("Serving the last cached copy of %s: %s", label, error)
+        return df
+    fallback_log.note(label, 'seed', None, error)
+    logger.warning("Serving seed data for %s: %s", label, error)
+    return warehouse.seed_query(query, params)
+
+
+class FallbackLog:
+    """Which queries are being answered from fallback data, for the freshness banner.
+
+    An entry stays until the query is next fetched from the warehouse or found
+    in the cache at its tables' current version, since the fallback data is
+    served from the in-memory caches until then.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def note(self, label, source, saved_at, error):
+        with self.lock:
+            self.entries[label] = {'source': source, 'saved_at': saved_at, 'since': time.time(), 'error': str(error)}
+
+    def clear(self, label):
+        with self.lock:
+            self.entries.pop(label, None)
+
+    def status(self):
+        with self.lock:
+            return dict(self.entries)
+
+
+# Shared by every session in the process
+fallback_log = FallbackLog()
+
+
+def cached_dashboard(backend, cache, tracker):
+    """Chart query results from the snapshot cache, re-fetching only those whose table changed"""
+    return dict(iter_dashboard(backend, cache, tracker))
+
+
+def iter_dashboard(backend, cache, tracker):
+    """Yield (name, dataframe) for every chart query as soon as it is available.
+
+    Cache hits come first. Missing or changed queries are then fetched
+    concurrently and yielded in completion order, so callers can render each
+    chart as its data arrives. In batched fetch mode they all arrive together.
+    """
+    table_versions = tracker.current(backend, [spec['table'] for spec in warehouse.CHART_QUERIES.values()])
+    versions = {name: table_versions[spec['table']] for name, spec in warehouse.CHART_QUERIES.items()}
+    missing = []
+    for name, query in warehouse.DASHBOARD_QUERIES.items():
+        df = cache.get(cache_key(backend, *query), versions[name])
+        if df is None:
+            missing.append(name)
+        else:
+            if known(versions[name]):
+                fallback_log.clear(name)
+            yield name, df
+    logger.info("Served %d of %d chart queries from cache", len(versions) - len(missing), len(versions))
+    if not missing:
+        return
+    if warehouse.FETCH_MODE == "batched":
+        key = (backend.name, tuple((name, versions[name]) for name in missing))
+        yield from single_flight.do(key, lambda: fetch_missing(backend, cache, missing, versions)).items()
+        return
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(missing)) as pool:
+        futures = {
+            pool.submit(single_flight.do, (backend.name, name, versions[name]),
+                        partial(fetch_chart, backend, cache, name, versions[name])): name
+            for name in missing
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    logger.info("Fetched %d chart queries from %s in %.2fs", len(missing), backend.name, time.perf_counter() - started)
+
+
+def fetch_chart(backend, cache, name, version):
+    sql, params = warehouse.DASHBOARD_QUERIES[name]
+    try:
+        df, seconds = warehouse.run_query(backend, sql, params=params, label=name)
+    except FALLBACK_ERRORS as error:
+        return cached_fallback(cache, cache_key(backend, sql, params), sql, params, name, error)
+    fallback_log.clear(name)
+    logger.info("Fetched %s from %s in %.2fs, scanning %s",
+                name, backend.name, seconds, warehouse.fmt_bytes(warehouse.bytes_scanned(df)))
+    cache.put(cache_key(backend, sql, params), df, version)
+    return df
+
+
+def cached_summary(backend, cache, tracker):
+    """Headline scalars as a dict, cached apart from the chart queries and keyed by their tables' versions"""
+    versions = tracker.current(backend, warehouse.SUMMARY_TABLES)
+    version = "|".join(versions[table] for table in warehouse.SUMMARY_TABLES)
+    df = cache.get(cache_key(backend, warehouse.SUMMARY_QUERY, warehouse.SUMMARY_PARAMS), version)
+    if df is None:
+        df = single_flight.do(
+            (backend.name, warehouse.SUMMARY_QUERY, version),
+            lambda: fetch_query(backend, cache, warehouse.SUMMARY_QUERY, warehouse.SUMMARY_PARAMS, version, 'summary'),
+        )
+    elif known(version):
+        fallback_log.clear('summary')
+    return {column: (None if pd.isna(value) else value) for column, value in df.to_dict('records')[0].items()}
+
+
+def fetch_missing(backend, cache, names, versions):
+    try:
+        fetched, _ = warehouse.fetch_snapshot(backend, {name: warehouse.CHART_QUERIES[name] for name in names})
+    except FALLBACK_ERRORS as error:
+        return {
+            name: cached_fallback(
+                cache, cache_key(backend, *warehouse.DASHBOARD_QUERIES[name]), *warehouse.DASHBOARD_QUERIES[name], name, error
+            )
+            for name in names
+        }
+    for name, df in fetched.items():
+        fallback_log.clear(name)
+        cache.put(cache_key(backend, *warehouse.DASHBOARD_QUERIES[name]), df, versions[name])
+    return fetched
+
+
+def compact(df):
+    """Copy of df with repeated strings as categoricals and numbers downcast where lossless"""
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_string_dtype(series) and series.nunique() <= len(series) * CATEGORY_RATIO:
+            series = series.astype("category")
+        elif pd.api.types.is_integer_dtype(series) and not pd.api.types.is_extension_array_dtype(series):
+            series = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_float_dtype(series):
+            narrow = series.astype("float32")
+            if ((narrow.astype(series.dtype) == series) | series.isna()).all():
+                series = narrow
+        columns[column] = series
+    return pd.DataFrame(columns, index=df.index)
+
+
+def nbytes(frames):
+    return int(sum(df.memory_usage(deep=True, index=True).sum() for df in frames.values()))
+
+
+SHARED_SUFFIX = ".blob"
+# Shared entries are prefixed with the time they were written
+_WRITTEN_AT = struct.Struct("<d")
+
+
+def entry_name(key, version):
+    return hashlib.sha256(f"{version}\0{key}".encode()).hexdigest()[:32]
+
+
+def to_ipc(df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def from_ipc(data):
+    return pa.ipc.open_stream(pa.py_buffer(data)).read_all().to_pandas()
+
+
+class FileStore:
+    """Blobs in a directory every instance mounts (Filestore, GCS FUSE, NFS).
+
+    Writes are atomic (temp file + rename), so instances never read each
+    other's partial entries. Expired entries are removed as writes come in.
+    """
+
+    def __init__(self, directory, ttl=SHARED_CACHE_TTL):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def read(self, name):
+        path = self.directory / f"{name}{SHARED_SUFFIX}"
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                return None
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def write(self, name, data):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as sink:
+                sink.write(data)
+            os.replace(tmp_path, self.directory / f"{name}{SHARED_SUFFIX}")
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self.expire()
+
+    def expire(self):
+        now = time.time()
+        for path in self.directory.iterdir():
+            try:
+                age = now - path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if age > self.ttl and path.suffix in (SHARED_SUFFIX, ".tmp"):
+                path.unlink(missing_ok=True)
+
+
+class RedisStore:
+    """Blobs in a Redis-compatible server (Memorystore, Valkey, Redis), expired by the server"""
+
+    def __init__(self, url, ttl=SHARED_CACHE_TTL):
+        import redis
+
+        self.client = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+        self.ttl = ttl
+
+    def read(self, name):
+        return self.client.get(f"hemp:{name}")
+
+    def write(self, name, data):
+        self.client.set(f"hemp:{name}", data, ex=self.ttl)
+
+
+class SharedCache:
+    """Arrow-serialized tables and figure specs in a store every instance reads.
+
+    Entries are keyed by name and version like the local tiers. The shared
+    tier is an optimization, so a store that is down or slow is logged and
+    treated as a miss rather than failing the page.
+    """
+
+    def __init__(self, store):
+        self.store = store
+
+    def read(self, key, version):
+        """(payload, unix time written), or None"""
+        try:
+            data = self.store.read(entry_name(key, version))
+        except Exception:
+            logger.warning("Shared cache read failed for %s", key[:80], exc_info=True)
+            return None
+        if data is None:
+            return None
+        (written_at,) = _WRITTEN_AT.unpack_from(data)
+        return data[_WRITTEN_AT.size:], written_at
+
+    def get_blob(self, key, version=DATA_VERSION):
+        entry = self.read(key, version)
+        return None if entry is None else entry[0]
+
+    def put_blob(self, key, data, version=DATA_VERSION):
+        try:
+            self.store.write(entry_name(key, version), _WRITTEN_AT.pack(time.time()) + data)
+        except Exception:
+            logger.warning("Shared cache write failed for %s", key[:80], exc_info=True)
+
+    def get(self, key, version=DATA_VERSION):
+        data = self.get_blob(key, version)
+        return None if data is None else from_ipc(data)
+
+    def put(self, key, df, version=DATA_VERSION):
+        self.put_blob(key, to_ipc(df), version)
+        self.put_blob(f"latest\0{key}", version.encode(), "")
+
+    def latest(self, key):
+        version = self.get_blob(f"latest\0{key}", "")
+        entry = None if version is None else self.read(key, version.decode())
+        return None if entry is None else (from_ipc(entry[0]), entry[1])
+
+
+def shared_cache(url=SHARED_CACHE_URL):
+    """SharedCache for a file:// or redis:// URL, or None when no shared tier is configured"""
+    if not url:
+        return None
+    if url.startswith("file://"):
+        return SharedCache(FileStore(url[len("file://"):]))
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return SharedCache(RedisStore(url))
+    raise ValueError(f"HEMP_SHARED_CACHE must be a file:// or redis:// URL, got {url!r}")
+
+
+class TieredCache:
+    """Local tier over an optional shared one, counting hits and misses per tier.
+
+    Reads try the local tier first; a shared hit is copied down so the next
+    read stays local. Writes go to every tier, so whichever instance fetches
+    from the warehouse first warms the rest.
+    """
+
+    def __init__(self, tiers):
+        self.tiers = tiers
+        self.counts = {name: {'hits': 0, 'misses': 0} for name, _ in tiers}
+        self.lock = threading.Lock()
+
+    def get(self, key, version=DATA_VERSION):
+        for depth, (name, tier) in enumerate(self.tiers):
+            df = tier.get(key, version)
+            with self.lock:
+                self.counts[name]['hits' if df is not None else 'misses'] += 1
+            if df is not None:
+                for _, upper in self.tiers[:depth]:
+                    upper.put(key, df, version)
+                return df
+        return None
+
+    def put(self, key, df, version=DATA_VERSION):
+        for _, tier in self.tiers:
+            tier.put(key, df, version)
+
+    def latest(self, key):
+        """(dataframe, unix time written) for the newest copy of key any tier holds, whatever its version"""
+        for _, tier in self.tiers:
+            found = tier.latest(key)
+            if found is not None:
+                return found
+        return None
+
+    def stats(self):
+        with self.lock:
+            return {name: tier_stats(counts['hits'], counts['misses']) for name, counts in self.counts.items()}
+
+
+def tier_stats(hits, misses):
+    lookups = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_rate': hits / lookups if lookups else None}
+
+
+def tiered_cache(shared=None):
+    """Disk (or memory, when HEMP_CACHE_DIR is empty) tier, over the shared tier if there is one"""
+    local = ('disk', DiskCache()) if CACHE_DIR else ('memory', MemoryCache())
+    return TieredCache([local, *([('shared', shared)] if shared is not None else [])])
+
+
+class SharedFrames:
+    """Dashboard tables held once per process, compacted, and handed to sessions as views.
+
+    views() returns shallow copies that share every column buffer with the
+    stored frames, so a rerun costs no deserialization and each session adds
+    only a few small frame objects. Copy-on-Write keeps the stored frames
+    read-only in effect: a session that writes to a view copies that column.
+    """
+
+    def __init__(self, data):
+        started = time.perf_counter()
+        self.frames = {name: compact(df) for name, df in data.items()}
+        self.compact_seconds = time.perf_counter() - started
+        self.source_bytes = nbytes(data)
+        self.nbytes = nbytes(self.frames)
+
+    def views(self):
+        return {name: df.copy(deep=False) for name, df in self.frames.items()}
+
+    def stats(self):
+        return {
+            'shared_bytes': self.nbytes,
+            'uncompacted_bytes': self.source_bytes,
+            'compact_seconds': self.compact_seconds,
+        }
+
+
+class StaleWhileRevalidate:
+    """Serves the last good value immediately and refreshes it on a background thread.
+
+    Only the very first get() blocks, since there is nothing to serve yet. After
+    that a stale value triggers at most one refresh thread, and the new value is
+    swapped in whole once it has loaded. A failed refresh keeps the old value.
+    """
+
+    def __init__(self, loader, max_age=REVALIDATE_SECONDS):
+        self.loader = loader
+        self.max_age = max_age
+        self.value = None
+        self.loaded_at = None
+        self.refreshing = False
+        self.lock = threading.Lock()
+        self.first_load = threading.Lock()
+
+    def age(self):
+        """Seconds since the value being served was loaded"""
+        return None if self.loaded_at is None else time.monotonic() - self.loaded_at
+
+    def get(self):
+        """Return (value, age in seconds)"""
+        if self.loaded_at is None:
+            with self.first_load:
+                if self.loaded_at is None:
+                    self.swap(self.loader())
+        with self.lock:
+            value, age = self.value, self.age()
+            if age > self.max_age and not self.refreshing:
+                self.refreshing = True
+                threading.Thread(target=self.refresh, name="dashboard-refresh", daemon=True).start()
+        return value, age
+
+    def refresh(self):
+        try:
+            self.swap(self.loader())
+        except Exception:
+            logger.exception("Background refresh failed; still serving data from %.0fs ago", self.age())
+        finally:
+            with self.lock:
+                self.refreshing = False
+
+    def swap(self, value):
+        with self.lock:
+            self.value, self.loaded_at = value, time.monotonic()
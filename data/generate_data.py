@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Synthetic data generator for load and stress testing
+Produces schema-conformant rows for all seven tables at a multiple of the seed
+data's size. Output is deterministic for a given seed and chunk size, and is
+streamed to Parquet or CSV part files one chunk at a time so memory stays
+bounded at any scale.
+
+Natural keys stay unique at every scale: geographies run 'US', then the
+states, then synthetic counties ('CA-001', ...); years run newest first; and
+the metric names the dashboard reads come first, so small scales still fill
+the hero cards. regulatory_status is state-level, so it never grows past one
+row per state.
+
+    python -m data.generate_data --scale 1000 --out /tmp/hemp-1000x
+"""
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from data.seed_data import CONSUMER_TRENDS, MARKET_METRICS, REGULATORY_STATUS, table_rows
+
+STATES = np.array([state for state, *_ in REGULATORY_STATUS])
+YEARS = np.arange(2025, 1999, -1)
+MARKET_YEARS = np.arange(2035, 1999, -1)  # market metrics include projections
+HEMP_TYPES = np.array(['all', 'floral', 'grain', 'fiber', 'seed'])
+# 'cannabis_all' is the industry-wide total the hero cards read, as in the seed data
+SECTORS = np.array(['cannabis_all', 'cultivation', 'processing', 'retail'])
+DEMOGRAPHICS = np.array(['all', 'gen_z', 'millennials', 'gen_x', 'boomers'])
+STATUSES = np.array(['legal', 'legal_restricted', 'dispensary_only', 'banned', 'pending'])
+THC_LIMITS = np.array([2.5, 5.0, 10.0, 100.0])
+EVENT_TYPES = np.array(['legislation', 'regulatory', 'market', 'milestone'])
+IMPACTS = np.array(['positive', 'negative', 'neutral'])
+MARKET_METRIC_NAMES = list(dict.fromkeys(['US Hemp Production Value', *(name for name, *_ in MARKET_METRICS)]))
+CONSUMER_METRIC_NAMES = list(dict.fromkeys(name for name, *_ in CONSUMER_TRENDS))
+FIRST_EVENT = np.datetime64('2000-01-01')
+EVENT_DAYS = 26 * 365
+LOADED_AT = pd.Timestamp("2025-11-01", tz="UTC")
+SOURCE = 'Synthetic'
+
+# Rows generated and written at a time, per table
+CHUNK_ROWS = 500_000
+# Columns written as DATE rather than TIMESTAMP
+DATE_COLUMNS = {'event_date', 'effective_date'}
+
+
+def geographies(index):
+    """'US', then each state, then synthetic counties, for an array of positions"""
+    names = np.empty(len(index), dtype=object)
+    names[index == 0] = 'US'
+    is_state = (index > 0) & (index <= len(STATES))
+    names[is_state] = STATES[index[is_state] - 1]
+    is_county = index > len(STATES)
+    county = index[is_county] - len(STATES) - 1
+    names[is_county] = (
+        pd.Series(STATES[county % len(STATES)]) + '-'
+        + pd.Series(county // len(STATES) + 1).astype(str).str.zfill(3)
+    ).to_numpy()
+    return names
+
+
+def labels(known, index, prefix):
+    """Known names first, then numbered synthetic ones"""
+    names = np.empty(len(index), dtype=object)
+    is_known = index < len(known)
+    names[is_known] = np.array(known)[index[is_known]]
+    names[~is_known] = (prefix + pd.Series(index[~is_known]).astype(str)).to_numpy()
+    return names
+
+
+def production_by_state(index, rng):
+    rest, years = np.divmod(index // len(HEMP_TYPES), len(YEARS))
+    planted = rng.integers(50, 50_000, len(index))
+    harvested = (planted * rng.uniform(0.6, 1.0, len(index))).astype(np.int64)
+    yield_per_acre = rng.uniform(200, 1500, len(index)).round(1)
+    production_lbs = (harvested * yield_per_acre).astype(np.int64)
+    return pd.DataFrame({
+        'state': geographies(rest),
+        'year': YEARS[years],
+        'planted_acres': planted,
+        'harvested_acres': harvested,
+        'production_lbs': production_lbs,
+        'yield_lbs_per_acre': yield_per_acre,
+        'production_value_usd': (production_lbs * rng.uniform(1, 30, len(index))).astype(np.int64),
+        'num_operations': rng.integers(1, 500, len(index)),
+        'hemp_type': HEMP_TYPES[index % len(HEMP_TYPES)],
+        'source': SOURCE,
+        'last_updated': LOADED_AT,
+    })
+
+
+def market_metrics(index, rng):
+    metrics, years = np.divmod(index, len(MARKET_YEARS))
+    year = MARKET_YEARS[years]
+    return pd.DataFrame({
+        'metric_name': labels(MARKET_METRIC_NAMES, metrics, 'Synthetic Market Metric '),
+        'year': year,
+        'value': rng.uniform(1e6, 1e10, len(index)).round(0),
+        'unit': 'USD',
+        'category': np.where(year > 2025, 'projection', 'market_size'),
+        'source': SOURCE,
+        'notes': None,
+        'last_updated': LOADED_AT,
+    })
+
+
+def employment_stats(index, rng):
+    rest, years = np.divmod(index // len(SECTORS), len(YEARS))
+    jobs = rng.integers(100, 500_000, len(index))
+    return pd.DataFrame({
+        'geography': geographies(rest),
+        'year': YEARS[years],
+        'total_jobs': jobs,
+        'job_growth_pct': rng.normal(5, 4, len(index)).round(1),
+        'total_wages_usd': jobs * rng.integers(30_000, 70_000, len(index)),
+        'sector': SECTORS[index % len(SECTORS)],
+        'source': SOURCE,
+        'last_updated': LOADED_AT,
+    })
+
+
+def regulatory_status(index, rng):
+    status = STATUSES[rng.integers(0, len(STATUSES), len(index))]
+    banned = status == 'banned'
+    serving = THC_LIMITS[rng.integers(0, len(THC_LIMITS), len(index))]
+    return pd.DataFrame({
+        'state': STATES[index],
+        'thc_beverage_status': status,
+        'max_thc_mg_per_serving': np.where(banned, np.nan, serving),
+        'max_thc_mg_per_package': np.where(banned, np.nan, serving * 10),
+        'age_restriction': pd.Series(21, index=range(len(index)), dtype="Int64").mask(banned).array,
+        'effective_date': FIRST_EVENT + rng.integers(0, EVENT_DAYS, len(index)).astype('timedelta64[D]'),
+        'notes': None,
+        'source': SOURCE,
+        'last_updated': LOADED_AT,
+    })
+
+
+def tax_revenue(index, rng):
+    rest, years = np.divmod(index // 4, len(YEARS))
+    return pd.DataFrame({
+        'state': geographies(rest),
+        'year': YEARS[years],
+        'quarter': index % 4 + 1,
+        'tax_revenue_usd': rng.integers(100_000, 500_000_000, len(index)),
+        'pct_of_state_revenue': rng.uniform(0.1, 2.5, len(index)).round(2),
+        'source': SOURCE,
+        'last_updated': LOADED_AT,
+    })
+
+
+def consumer_trends(index, rng):
+    metrics, years = np.divmod(index // len(DEMOGRAPHICS), len(YEARS))
+    return pd.DataFrame({
+        'metric_name': labels(CONSUMER_METRIC_NAMES, metrics, 'Synthetic Consumer Metric '),
+        'year': YEARS[years],
+        'value': rng.uniform(1, 100, len(index)).round(1),
+        'unit': 'percent',
+        'demographic': DEMOGRAPHICS[index % len(DEMOGRAPHICS)],
+        'source': SOURCE,
+        'last_updated': LOADED_AT,
+    })
+
+
+def industry_timeline(index, rng):
+    numbers = pd.Series(index).astype(str)
+    return pd.DataFrame({
+        'event_date': FIRST_EVENT + rng.integers(0, EVENT_DAYS, len(index)).astype('timedelta64[D]'),
+        'event_type': EVENT_TYPES[rng.integers(0, len(EVENT_TYPES), len(index))],
+        'title': ('Synthetic event ' + numbers).to_numpy(),
+        'description': ('Generated description for event ' + numbers).to_numpy(),
+        'impact': IMPACTS[rng.integers(0, len(IMPACTS), len(index))],
+        'source': SOURCE,
+    })
+
+
+# Row builders by table, in schema order; each takes row positions and an RNG
+BUILDERS = {
+    'production_by_state': production_by_state,
+    'market_metrics': market_metrics,
+    'employment_stats': employment_stats,
+    'regulatory_status': regulatory_status,
+    'consumer_trends': consumer_trends,
+    'tax_revenue': tax_revenue,
+    'industry_timeline': industry_timeline,
+}
+
+
+# Tables keyed by state alone; more rows would need synthetic counties, which
+# the dashboard's state-level regulatory map and counts can't place
+MAX_ROWS = {'regulatory_status': len(STATES)}
+
+
+def row_counts(scale):
+    """Rows per table at a multiple of the seed data's size"""
+    return {
+        table: min(max(1, round(len(rows) * scale)), MAX_ROWS.get(table, float('inf')))
+        for table, rows in table_rows().items()
+    }
+
+
+def chunks(table, rows, seed=0, chunk_rows=CHUNK_ROWS):
+    """Yield a table's synthetic rows as dataframes of at most chunk_rows"""
+    build = BUILDERS[table]
+    salt = list(BUILDERS).index(table)
+    for start in range(0, rows, chunk_rows):
+        index = np.arange(start, min(start + chunk_rows, rows))
+        yield build(index, np.random.default_rng([seed, salt, start]))
+
+
+def generate(scale, seed=0, chunk_rows=CHUNK_ROWS):
+    """Yield (table, dataframe) chunks for every table at the given scale"""
+    for table, rows in row_counts(scale).items():
+        for chunk in chunks(table, rows, seed, chunk_rows):
+            yield table, chunk
+
+
+def to_arrow(df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for column in DATE_COLUMNS & set(df.columns):
+        table = table.set_column(table.schema.get_field_index(column), column, table[column].cast(pa.date32()))
+    return table
+
+
+def write(out_dir, scale, seed=0, fmt="parquet", chunk_rows=CHUNK_ROWS):
+    """Write <out_dir>/<table>/part-NNNNN.<fmt> files; returns rows written per table"""
+    written = {}
+    for table, rows in row_counts(scale).items():
+        directory = Path(out_dir) / table
+        directory.mkdir(parents=True, exist_ok=True)
+        for part, chunk in enumerate(chunks(table, rows, seed, chunk_rows)):
+            path = directory / f"part-{part:05d}.{fmt}"
+            if fmt == "parquet":
+                pq.write_table(to_arrow(chunk), path)
+            else:
+                pacsv.write_csv(to_arrow(chunk), path)
+        written[table] = rows
+    return written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=10, help="multiple of the seed data's size (default: 10)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    parser.add_argument("--format", choices=("parquet", "csv"), default="parquet")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS,
+                        help=f"rows per part file; part of what makes output reproducible (default: {CHUNK_ROWS})")
+    parser.add_argument("--out", required=True, help="output directory")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    written = write(args.out, args.scale, args.seed, args.format, args.chunk_rows)
+    seconds = time.perf_counter() - started
+    for table, rows in written.items():
+        print(f"{table:<22} {rows:>12,} rows")
+    total = sum(written.values())
+    print(f"Wrote {total:,} rows to {args.out} in {seconds:.1f}s ({total / seconds:,.0f} rows/sec)")
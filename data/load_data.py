@@ -1,175 +1,210 @@
 #!/usr/bin/env python3
 """
 Load seed data into BigQuery hemp_advocacy dataset
+Each table is serialized to Parquet and loaded with a batch load job rather
+than streamed row by row; the jobs for all tables run concurrently.
+
+The default sync mode is idempotent: rows carry a content hash, only rows that
+are new or changed are staged, and they are MERGEd into the target on the
+table's natural key. --mode append loads every row as-is.
 """
+import argparse
+import hashlib
+import io
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timezone
+
+import pyarrow as pa
+import pyarrow.parquet as pq
 from google.cloud import bigquery
-from datetime import datetime
-from seed_data import (
-    PRODUCTION_NATIONAL,
-    MARKET_METRICS,
-    EMPLOYMENT_STATS,
-    REGULATORY_STATUS,
-    TAX_REVENUE,
-    CONSUMER_TRENDS,
-    INDUSTRY_TIMELINE
-)
+from seed_data import table_rows
 
 PROJECT_ID = "artful-logic-475116-p1"
 DATASET_ID = "hemp_advocacy"
 
 client = bigquery.Client(project=PROJECT_ID)
 
-def load_production_data():
-    """Load national production data"""
-    table_id = f"{PROJECT_ID}.{DATASET_ID}.production_by_state"
-    rows = []
-    for year, planted, harvested, value, hemp_type, source in PRODUCTION_NATIONAL:
-        rows.append({
-            "state": "US",
-            "year": year,
-            "planted_acres": planted,
-            "harvested_acres": harvested,
-            "production_value_usd": value,
-            "hemp_type": hemp_type,
-            "source": source,
-        })
-
-    errors = client.insert_rows_json(table_id, rows)
-    if errors:
-        print(f"Errors loading production data: {errors}")
-    else:
-        print(f"Loaded {len(rows)} production records")
-
-def load_market_metrics():
-    """Load market metrics"""
-    table_id = f"{PROJECT_ID}.{DATASET_ID}.market_metrics"
-    rows = []
-    for name, year, value, unit, category, source, notes in MARKET_METRICS:
-        rows.append({
-            "metric_name": name,
-            "year": year,
-            "value": float(value),
-            "unit": unit,
-            "category": category,
-            "source": source,
-            "notes": notes,
-        })
-
-    errors = client.insert_rows_json(table_id, rows)
-    if errors:
-        print(f"Errors loading market metrics: {errors}")
-    else:
-        print(f"Loaded {len(rows)} market metric records")
-
-def load_employment_stats():
-    """Load employment statistics"""
-    table_id = f"{PROJECT_ID}.{DATASET_ID}.employment_stats"
-    rows = []
-    for geo, year, jobs, growth, wages, sector, source in EMPLOYMENT_STATS:
-        rows.append({
-            "geography": geo,
-            "year": year,
-            "total_jobs": jobs,
-            "job_growth_pct": growth,
-            "total_wages_usd": wages,
-            "sector": sector,
-            "source": source,
-        })
-
-    errors = client.insert_rows_json(table_id, rows)
-    if errors:
-        print(f"Errors loading employment stats: {errors}")
-    else:
-        print(f"Loaded {len(rows)} employment records")
-
-def load_regulatory_status():
-    """Load state regulatory status"""
-    table_id = f"{PROJECT_ID}.{DATASET_ID}.regulatory_status"
-    rows = []
-    for state, status, max_serv, max_pkg, age, notes, source in REGULATORY_STATUS:
-        rows.append({
-            "state": state,
-            "thc_beverage_status": status,
-            "max_thc_mg_per_serving": max_serv,
-            "max_thc_mg_per_package": max_pkg,
-            "age_restriction": age,
-            "notes": notes,
-            "source": source,
-        })
-
-    errors = client.insert_rows_json(table_id, rows)
-    if errors:
-        print(f"Errors loading regulatory status: {errors}")
-    else:
-        print(f"Loaded {len(rows)} regulatory records")
-
-def load_tax_revenue():
-    """Load tax revenue data"""
-    table_id = f"{PROJECT_ID}.{DATASET_ID}.tax_revenue"
-    rows = []
-    for state, year, quarter, revenue, pct, source in TAX_REVENUE:
-        rows.append({
-            "state": state,
-            "year": year,
-            "quarter": quarter,
-            "tax_revenue_usd": revenue,
-            "pct_of_state_revenue": pct,
-            "source": source,
-        })
-
-    errors = client.insert_rows_json(table_id, rows)
-    if errors:
-        print(f"Errors loading tax revenue: {errors}")
-    else:
-        print(f"Loaded {len(rows)} tax revenue records")
-
-def load_consumer_trends():
-    """Load consumer trends data"""
-    table_id = f"{PROJECT_ID}.{DATASET_ID}.consumer_trends"
-    rows = []
-    for name, year, value, unit, demo, source in CONSUMER_TRENDS:
-        rows.append({
-            "metric_name": name,
-            "year": year,
-            "value": float(value),
-            "unit": unit,
-            "demographic": demo,
-            "source": source,
-        })
-
-    errors = client.insert_rows_json(table_id, rows)
-    if errors:
-        print(f"Errors loading consumer trends: {errors}")
-    else:
-        print(f"Loaded {len(rows)} consumer trend records")
-
-def load_industry_timeline():
-    """Load industry timeline events"""
-    table_id = f"{PROJECT_ID}.{DATASET_ID}.industry_timeline"
-    rows = []
-    for date, event_type, title, desc, impact, source in INDUSTRY_TIMELINE:
-        rows.append({
-            "event_date": date,
-            "event_type": event_type,
-            "title": title,
-            "description": desc,
-            "impact": impact,
-            "source": source,
-        })
-
-    errors = client.insert_rows_json(table_id, rows)
-    if errors:
-        print(f"Errors loading timeline: {errors}")
-    else:
-        print(f"Loaded {len(rows)} timeline records")
+# Columns identifying a row across loads; sync mode upserts on these
+NATURAL_KEYS = {
+    'production_by_state': ('state', 'year', 'hemp_type'),
+    'market_metrics': ('metric_name', 'year'),
+    'employment_stats': ('geography', 'year', 'sector'),
+    'regulatory_status': ('state',),
+    'tax_revenue': ('state', 'year', 'quarter'),
+    'consumer_trends': ('metric_name', 'year', 'demographic'),
+    'industry_timeline': ('event_date', 'title'),
+}
+
+# get_table() reports legacy type names for DDL-created columns
+_ARROW_TYPES = {
+    "STRING": pa.string(),
+    "INTEGER": pa.int64(),
+    "INT64": pa.int64(),
+    "FLOAT": pa.float64(),
+    "FLOAT64": pa.float64(),
+    "BOOLEAN": pa.bool_(),
+    "BOOL": pa.bool_(),
+    "DATE": pa.date32(),
+    "TIMESTAMP": pa.timestamp("us", tz="UTC"),
+}
+
+
+def to_parquet(rows, schema, loaded_at):
+    """Rows as an in-memory Parquet file typed to the destination table's schema
+
+    Only the columns present in the rows are written, plus last_updated (set to
+    loaded_at) where the table has it, since load jobs don't evaluate DEFAULTs
+    for columns the file omits
+    """
+    stamped = any(field.name == "last_updated" for field in schema)
+    if stamped:
+        rows = [{**row, "last_updated": loaded_at} for row in rows]
+    columns = rows[0].keys()
+    fields = [field for field in schema if field.name in columns]
+    arrays = {}
+    for field in fields:
+        values = [row[field.name] for row in rows]
+        if field.field_type == "DATE":
+            values = [date.fromisoformat(value) if isinstance(value, str) else value for value in values]
+        arrays[field.name] = pa.array(values, type=_ARROW_TYPES[field.field_type])
+    buffer = io.BytesIO()
+    pq.write_table(pa.table(arrays), buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def row_hash(row):
+    """Content hash of a row's values, ignoring when it was loaded"""
+    values = {column: value for column, value in row.items() if column not in ("last_updated", "row_hash")}
+    return hashlib.sha256(json.dumps(values, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def natural_key(row, keys):
+    # Stringified so seed values ('2024-01-01') compare equal to fetched ones (date objects)
+    return tuple(None if row[key] is None else str(row[key]) for key in keys)
+
+
+def submit_load(rows, destination, table_id, loaded_at, write_disposition):
+    job_config = bigquery.LoadJobConfig(
+        source_format=bigquery.SourceFormat.PARQUET,
+        write_disposition=write_disposition,
+    )
+    job = client.load_table_from_file(
+        to_parquet(rows, destination.schema, loaded_at), table_id, job_config=job_config
+    )
+    job.result()
+    return job.output_rows
+
+
+def load_table(table, rows, loaded_at):
+    """Append rows to a table with one Parquet load job; returns (rows loaded, seconds)"""
+    table_id = f"{PROJECT_ID}.{DATASET_ID}.{table}"
+    started = time.perf_counter()
+    destination = client.get_table(table_id)
+    loaded = submit_load(rows, destination, table_id, loaded_at, bigquery.WriteDisposition.WRITE_APPEND)
+    return loaded, time.perf_counter() - started
+
+
+def with_row_hash(destination):
+    """Add the row_hash column to tables created before it was in the schema"""
+    if any(field.name == "row_hash" for field in destination.schema):
+        return destination
+    destination.schema = [*destination.schema, bigquery.SchemaField("row_hash", "STRING")]
+    return client.update_table(destination, ["schema"])
+
+
+def existing_hashes(table_id, keys):
+    """{natural key: row_hash} for rows already in the table, plus keys seen more than once"""
+    result = client.query(f"SELECT {', '.join(keys)}, row_hash FROM `{table_id}`").result()
+    hashes, duplicates = {}, set()
+    for row in result:
+        key = natural_key(row, keys)
+        if key in hashes:
+            duplicates.add(key)
+        hashes[key] = row["row_hash"]
+    return hashes, duplicates
+
+
+def merge_statement(table_id, staging_id, keys, columns):
+    """MERGE staged rows into the target: update on a key match, insert otherwise"""
+    on = " AND ".join(f"T.{key} IS NOT DISTINCT FROM S.{key}" for key in keys)
+    updates = ", ".join(f"{column} = S.{column}" for column in columns if column not in keys)
+    names = ", ".join(columns)
+    values = ", ".join(f"S.{column}" for column in columns)
+    return (
+        f"MERGE INTO `{table_id}` T USING `{staging_id}` S ON {on} "
+        f"WHEN MATCHED AND T.row_hash IS DISTINCT FROM S.row_hash THEN UPDATE SET {updates} "
+        f"WHEN NOT MATCHED THEN INSERT ({names}) VALUES ({values})"
+    )
+
+
+def sync_table(table, rows, loaded_at):
+    """Upsert only new or changed rows on the natural key; returns (rows merged, seconds)
+
+    A table whose rows all hash the same as last time is left untouched
+    """
+    table_id = f"{PROJECT_ID}.{DATASET_ID}.{table}"
+    keys = NATURAL_KEYS[table]
+    started = time.perf_counter()
+    destination = with_row_hash(client.get_table(table_id))
+    current, duplicates = existing_hashes(table_id, keys)
+    if duplicates:
+        print(f"Warning: {table} already holds {len(duplicates)} duplicated keys; sync updates them but does not remove the copies")
+    delta = [row for row in rows if current.get(natural_key(row, keys)) != row["row_hash"]]
+    if not delta:
+        return 0, time.perf_counter() - started
+
+    staging_id = f"{PROJECT_ID}.{DATASET_ID}._staging_{table}"
+    try:
+        submit_load(delta, destination, staging_id, loaded_at, bigquery.WriteDisposition.WRITE_TRUNCATE)
+        columns = [field.name for field in destination.schema if field.name in delta[0] or field.name == "last_updated"]
+        client.query(merge_statement(table_id, staging_id, keys, columns)).result()
+    finally:
+        client.delete_table(staging_id, not_found_ok=True)
+    return len(delta), time.perf_counter() - started
+
+
+def load_all(rows_by_table=None, mode="sync"):
+    """Load every table concurrently, printing rows/sec per table; returns failed tables"""
+    worker = sync_table if mode == "sync" else load_table
+    rows_by_table = {
+        table: [{**row, "row_hash": row_hash(row)} for row in rows]
+        for table, rows in (rows_by_table or table_rows()).items() if rows
+    }
+    loaded_at = datetime.now(timezone.utc)
+    failed = []
+    with ThreadPoolExecutor(max_workers=len(rows_by_table)) as pool:
+        futures = {
+            pool.submit(worker, table, rows, loaded_at): table
+            for table, rows in rows_by_table.items()
+        }
+        for future in as_completed(futures):
+            table = futures[future]
+            try:
+                loaded, seconds = future.result()
+            except Exception as e:
+                print(f"Errors loading {table}: {e}")
+                failed.append(table)
+                continue
+            if mode == "sync" and not loaded:
+                print(f"{table} unchanged ({seconds:.2f}s)")
+            else:
+                print(f"Loaded {loaded} {table} records in {seconds:.2f}s ({loaded / seconds:,.0f} rows/sec)")
+    return failed
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("sync", "append"), default="sync",
+                        help="sync upserts only new or changed rows (default); append loads every row")
+    args = parser.parse_args()
+
     print("Loading hemp advocacy data into BigQuery...")
-    load_production_data()
-    load_market_metrics()
-    load_employment_stats()
-    load_regulatory_status()
-    load_tax_revenue()
-    load_consumer_trends()
-    load_industry_timeline()
-    print("Done!")
+    started = time.perf_counter()
+    failed = load_all(mode=args.mode)
+    print(f"Done in {time.perf_counter() - started:.2f}s")
+    if failed:
+        sys.exit(1)
@@ -161,3 +161,44 @@ HERO_METRICS = {
     'states_restricted': 9,
     'states_banned': 6,
 }
+
+
+def table_rows():
+    """Seed tuples as column dicts, keyed by destination table"""
+    return {
+        'production_by_state': [
+            {"state": "US", "year": year, "planted_acres": planted, "harvested_acres": harvested,
+             "production_value_usd": value, "hemp_type": hemp_type, "source": source}
+            for year, planted, harvested, value, hemp_type, source in PRODUCTION_NATIONAL
+        ],
+        'market_metrics': [
+            {"metric_name": name, "year": year, "value": float(value), "unit": unit,
+             "category": category, "source": source, "notes": notes}
+            for name, year, value, unit, category, source, notes in MARKET_METRICS
+        ],
+        'employment_stats': [
+            {"geography": geo, "year": year, "total_jobs": jobs, "job_growth_pct": growth,
+             "total_wages_usd": wages, "sector": sector, "source": source}
+            for geo, year, jobs, growth, wages, sector, source in EMPLOYMENT_STATS
+        ],
+        'regulatory_status': [
+            {"state": state, "thc_beverage_status": status, "max_thc_mg_per_serving": max_serv,
+             "max_thc_mg_per_package": max_pkg, "age_restriction": age, "notes": notes, "source": source}
+            for state, status, max_serv, max_pkg, age, notes, source in REGULATORY_STATUS
+        ],
+        'tax_revenue': [
+            {"state": state, "year": year, "quarter": quarter, "tax_revenue_usd": revenue,
+             "pct_of_state_revenue": pct, "source": source}
+            for state, year, quarter, revenue, pct, source in TAX_REVENUE
+        ],
+        'consumer_trends': [
+            {"metric_name": name, "year": year, "value": float(value), "unit": unit,
+             "demographic": demo, "source": source}
+            for name, year, value, unit, demo, source in CONSUMER_TRENDS
+        ],
+        'industry_timeline': [
+            {"event_date": date, "event_type": event_type, "title": title, "description": desc,
+             "impact": impact, "source": source}
+            for date, event_type, title, desc, impact, source in INDUSTRY_TIMELINE
+        ],
+    }
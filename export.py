@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Static HTML snapshot of the dashboard
+Runs app.py headlessly through Streamlit's AppTest with every section open and
+writes what it renders to a self-contained bundle: index.html carrying the
+app's CSS, every Plotly figure and the whole timeline, plus one shared
+plotly.min.js. The bundle can be served from any static file server or CDN;
+the live app stays the place for filtering and drilling in.
+
+The bundle records the data version it was built from and is only rebuilt when
+a table (or HEMP_DATA_VERSION) changes, so it is cheap to run on a schedule.
+
+    python export.py --out dist/snapshot
+    python export.py --out dist/snapshot --force
+"""
+import argparse
+import hashlib
+import html
+import os
+import re
+import shutil
+import sys
+import time
+from pathlib import Path
+
+# The snapshot is one consistent page, built in script order from a single load
+os.environ["HEMP_RENDER_MODE"] = "blocking"
+os.environ["HEMP_REFRESH_MODE"] = "blocking"
+
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+
+import caching
+import headless
+import timeline
+import warehouse
+
+# The live app pages and filters the timeline; the snapshot shows every event
+TIMELINE_EXPANDER = "Show timeline"
+VERSION_FILE = "VERSION"
+PLOTLY_JS = "plotly.min.js"
+# Closest match to the dark theme Streamlit applies to figures in the live app
+FIGURE_TEMPLATE = "plotly_dark"
+
+# Layout the Streamlit frontend would otherwise provide
+PAGE_CSS = """
+<style>
+    body { margin: 0; }
+    .stApp { min-height: 100vh; padding: 48px 5vw; box-sizing: border-box; }
+    .row { display: flex; gap: 24px; align-items: flex-start; }
+    .row > .column { min-width: 0; }
+    details { border: 1px solid rgba(255, 255, 255, 0.08); border-radius: 8px; padding: 8px 16px; margin-bottom: 16px; }
+    summary { cursor: pointer; color: #9ca3af; padding: 4px 0; }
+    hr { border: none; border-top: 1px solid rgba(255, 255, 255, 0.08); margin: 32px 0; }
+    @media (max-width: 800px) { .row { flex-direction: column; } }
+</style>
+"""
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+
+
+def snapshot_version(backend):
+    """Hash of HEMP_DATA_VERSION and the version of every table the dashboard reads"""
+    tables = sorted({spec['table'] for spec in warehouse.CHART_QUERIES.values()} | set(warehouse.SUMMARY_TABLES))
+    versions = backend.table_versions(tables)
+    marker = "|".join([caching.DATA_VERSION, *(f"{table}={versions[table]}" for table in tables)])
+    return hashlib.sha256(marker.encode()).hexdigest()[:16]
+
+
+def markdown_html(text):
+    """HTML for the little Markdown app.py uses: headings, rules, bullet lists and bold"""
+    lines, in_list = [], False
+    for line in text.splitlines():
+        stripped = line.strip()
+        if in_list and not stripped.startswith("- "):
+            lines.append("</ul>")
+            in_list = False
+        if stripped == "---":
+            lines.append("<hr>")
+        elif match := _HEADING.match(stripped):
+            level = len(match.group(1))
+            lines.append(f"<h{level}>{match.group(2)}</h{level}>")
+        elif stripped.startswith("- "):
+            if not in_list:
+                lines.append("<ul>")
+                in_list = True
+            lines.append(f"<li>{stripped[2:]}</li>")
+        else:
+            lines.append(line)
+    if in_list:
+        lines.append("</ul>")
+    return _BOLD.sub(r"<strong>\1</strong>", "\n".join(lines))
+
+
+def figure_html(element):
+    """A plotly_chart element's figure as a div and script, with plotly.js loaded separately"""
+    figure = pio.from_json(element.proto.spec)
+    figure.update_layout(template=FIGURE_TEMPLATE)
+    return pio.to_html(
+        figure, include_plotlyjs=False, full_html=False,
+        config={'displaylogo': False, 'responsive': True}, default_width="100%",
+    )
+
+
+def render(node, timeline_html):
+    """HTML for an AppTest element tree node; input widgets are dropped"""
+    kind = type(node).__name__
+    if kind == "Markdown":
+        return markdown_html(node.value)
+    if kind == "UnknownElement" and node.type == "plotly_chart":
+        return figure_html(node)
+    if kind == "Expander":
+        body = timeline_html if node.label == TIMELINE_EXPANDER else render_children(node, timeline_html)
+        return f"<details open><summary>{html.escape(node.label)}</summary>{body}</details>"
+    if kind == "Column":
+        return f'<div class="column" style="flex: {node.proto.weight};">{render_children(node, timeline_html)}</div>'
+    if kind in ("Block", "SpecialBlock"):
+        body = render_children(node, timeline_html)
+        if any(type(child).__name__ == "Column" for child in node.children.values()):
+            return f'<div class="row">{body}</div>'
+        return body
+    return ""
+
+
+def render_children(node, timeline_html):
+    return "".join(render(child, timeline_html) for child in node.children.values())
+
+
+def full_timeline(backend):
+    sql, params = warehouse.DASHBOARD_QUERIES['timeline']
+    df, _ = warehouse.run_query(backend, sql, params=params, label='export_timeline')
+    return timeline.render_html(timeline.filter_events(df))
+
+
+def render_page(backend, version):
+    """The whole dashboard as one HTML document"""
+    at = headless.app_test(timeout=300)
+    headless.run(at)
+    body = render(at.main, full_timeline(backend))
+    built = time.strftime("%Y-%m-%d %H:%M %Z")
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<meta name="data-version" content="{version}">
+<title>Hemp Industry Economic Impact</title>
+<script src="{PLOTLY_JS}"></script>
+{PAGE_CSS}
+</head>
+<body>
+<div class="stApp">
+{body}
+<p class='source-citation' style='text-align:center;'>Static snapshot built {built}</p>
+</div>
+</body>
+</html>
+"""
+
+
+def export(backend, out_dir, force=False):
+    """Write the bundle to out_dir unless it is already at the current data version; returns whether it was written"""
+    out_dir = Path(out_dir)
+    version = snapshot_version(backend)
+    version_file = out_dir / VERSION_FILE
+    if not force and version_file.exists() and version_file.read_text().strip() == version:
+        return False
+    # Build beside the live bundle and swap it in whole, so a server never sees half of one
+    staging = out_dir.with_name(f".{out_dir.name}.staging")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    (staging / "index.html").write_text(render_page(backend, version), encoding="utf-8")
+    (staging / PLOTLY_JS).write_text(get_plotlyjs(), encoding="utf-8")
+    (staging / VERSION_FILE).write_text(version + "\n")
+    previous = out_dir.with_name(f".{out_dir.name}.previous")
+    shutil.rmtree(previous, ignore_errors=True)
+    if out_dir.exists():
+        out_dir.rename(previous)
+    staging.rename(out_dir)
+    shutil.rmtree(previous, ignore_errors=True)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="dist/snapshot", help="bundle directory (default: dist/snapshot)")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the data version is unchanged")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if not export(headless.make_backend(), args.out, args.force):
+        print(f"{args.out} is already at the current data version; nothing to do")
+        return 0
+    size = sum(path.stat().st_size for path in Path(args.out).iterdir())
+    print(f"Wrote {args.out} ({warehouse.fmt_bytes(size)}) in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
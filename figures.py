@@ -0,0 +1,362 @@
+"""
+Plotly figures for the dashboard, and a cache that reuses them while their
+input data is unchanged
+"""
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+import pandas as pd
+import plotly.graph_objects as go
+
+# Part of every shared-tier figure key, so instances on a new deploy don't reuse
+# figures built by the previous deploy's builders
+SOURCE_VERSION = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:12]
+
+
+def sankey():
+    """Hemp industry value chain ($M)"""
+    # Sankey diagram showing dollar value flow through the industry
+    fig_sankey = go.Figure(data=[go.Sankey(
+        node=dict(
+            pad=20,
+            thickness=25,
+            line=dict(color='rgba(255,255,255,0.1)', width=1),
+            label=[
+                'Hemp Production<br>$445M',
+                'Processing &<br>Manufacturing',
+                'CBD Products<br>$180M',
+                'THC Beverages<br>$120M',
+                'Fiber/Grain<br>$145M',
+                'Wholesale &<br>Distribution',
+                'Retail Sales<br>$1.8B'
+            ],
+            color=['#047857', '#059669', '#10b981', '#34d399', '#6ee7b7',
+                   '#10b981', '#34d399'],
+            x=[0.0, 0.25, 0.5, 0.5, 0.5, 0.75, 1.0],
+            y=[0.5, 0.5, 0.15, 0.5, 0.85, 0.5, 0.5]
+        ),
+        link=dict(
+            source=[0, 1, 1, 1, 2, 3, 4, 5],
+            target=[1, 2, 3, 4, 5, 5, 5, 6],
+            value=[445, 180, 120, 145, 540, 360, 435, 1800],
+            color=['rgba(16,185,129,0.3)', 'rgba(52,211,153,0.3)', 'rgba(110,231,183,0.3)',
+                   'rgba(167,243,208,0.3)', 'rgba(16,185,129,0.25)', 'rgba(52,211,153,0.25)',
+                   'rgba(110,231,183,0.25)', 'rgba(16,185,129,0.3)'],
+            hovertemplate='%{source.label} → %{target.label}<br>$%{value}M<extra></extra>'
+        )
+    )])
+    fig_sankey.update_layout(
+        title=dict(text="Hemp Industry Value Chain ($M)", font=dict(size=18, color='#f3f4f6')),
+        height=450,
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#d1d5db', size=12, family='Space Grotesk'),
+        margin=dict(t=60, l=20, r=20, b=20)
+    )
+    return fig_sankey
+
+
+def donut():
+    """Market breakdown by segment"""
+    # Donut chart for market segments
+    fig_donut = go.Figure(data=[go.Pie(
+        labels=['CBD Products', 'THC Beverages', 'Fiber Products', 'Seed & Oil'],
+        values=[180, 120, 100, 45],
+        hole=0.6,
+        marker=dict(
+            colors=['#10b981', '#34d399', '#6ee7b7', '#a7f3d0'],
+            line=dict(color='#1a1a2e', width=2)
+        ),
+        textinfo='label+percent',
+        textposition='outside',
+        textfont=dict(color='#d1d5db', size=12),
+        hovertemplate='<b>%{label}</b><br>$%{value}M<br>%{percent}<extra></extra>'
+    )])
+    fig_donut.add_annotation(
+        text='<b>$445M</b><br>Total',
+        x=0.5, y=0.5,
+        font=dict(size=20, color='#10b981', family='Space Grotesk'),
+        showarrow=False
+    )
+    fig_donut.update_layout(
+        title=dict(text="Market Breakdown by Segment", font=dict(size=16, color='#f3f4f6')),
+        height=420,
+        paper_bgcolor='rgba(0,0,0,0)',
+        showlegend=False,
+        margin=dict(t=60, l=20, r=20, b=20)
+    )
+    return fig_donut
+
+
+def growth_area():
+    """Market growth trajectory to 2030"""
+    # Area chart for market growth trajectory
+    years = [2023, 2024, 2025, 2026, 2027, 2028, 2029, 2030]
+    values = [1.8, 2.2, 2.7, 3.3, 4.0, 4.9, 6.0, 7.8]
+    fig_area = go.Figure()
+    fig_area.add_trace(go.Scatter(
+        x=years,
+        y=values,
+        mode='lines+markers+text',
+        fill='tozeroy',
+        fillcolor='rgba(16, 185, 129, 0.15)',
+        line=dict(color='#10b981', width=3),
+        marker=dict(size=10, color='#10b981', line=dict(width=2, color='#0a0a0a')),
+        text=[f'${v}B' for v in values],
+        textposition='top center',
+        textfont=dict(color='#10b981', size=11),
+        hovertemplate='<b>%{x}</b><br>$%{y}B<extra></extra>'
+    ))
+    fig_area.update_layout(
+        title=dict(text="Market Growth Trajectory (21.1% CAGR)", font=dict(size=16, color='#f3f4f6')),
+        height=420,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Space Grotesk', color='#9ca3af'),
+        xaxis=dict(
+            gridcolor='rgba(255,255,255,0.05)',
+            tickfont=dict(color='#9ca3af'),
+            dtick=1
+        ),
+        yaxis=dict(
+            gridcolor='rgba(255,255,255,0.05)',
+            tickfont=dict(color='#9ca3af'),
+            tickprefix='$',
+            ticksuffix='B',
+            range=[0, 9]
+        ),
+        margin=dict(t=60, l=60, r=20, b=40),
+        showlegend=False
+    )
+    return fig_area
+
+
+def regulatory_map(regulatory):
+    """Choropleth of THC beverage status by state"""
+    reg_df = regulatory.copy()
+    status_map = {'legal': 4, 'legal_restricted': 3, 'pending': 2, 'dispensary_only': 1, 'banned': 0}
+    reg_df['status_num'] = reg_df['thc_beverage_status'].astype(object).map(status_map)
+    fig = go.Figure(data=go.Choropleth(
+        locations=reg_df['state'],
+        z=reg_df['status_num'],
+        locationmode='USA-states',
+        colorscale=[
+            [0, '#ef4444'],
+            [0.25, '#f97316'],
+            [0.5, '#fbbf24'],
+            [0.75, '#34d399'],
+            [1, '#10b981']
+        ],
+        showscale=False,
+        hovertemplate="<b>%{location}</b><br>%{text}<extra></extra>",
+        text=reg_df['thc_beverage_status'].str.replace('_', ' ').str.title(),
+        marker_line_color='#1a1a2e',
+        marker_line_width=1
+    ))
+    fig.update_layout(
+        geo=dict(
+            scope='usa',
+            projection=dict(type='albers usa'),
+            showlakes=False,
+            bgcolor='rgba(0,0,0,0)',
+            landcolor='rgba(255,255,255,0.02)',
+        ),
+        margin=dict(l=0, r=0, t=0, b=0),
+        height=420,
+        paper_bgcolor='rgba(0,0,0,0)',
+    )
+    return fig
+
+
+def employment_funnel():
+    """Employment funnel"""
+    fig_funnel = go.Figure(go.Funnel(
+        y=['Total Industry', 'Direct Employment', 'Cannabis Sector', 'Hemp-Specific', 'New Hires 2024'],
+        x=[440000, 320000, 280000, 160000, 23760],
+        textposition='inside',
+        textinfo='value+percent initial',
+        opacity=0.85,
+        marker=dict(
+            color=['#059669', '#10b981', '#34d399', '#6ee7b7', '#a7f3d0'],
+            line=dict(width=2, color='#1a1a2e')
+        ),
+        connector=dict(line=dict(color='rgba(255,255,255,0.1)', width=2))
+    ))
+    fig_funnel.update_layout(
+        title=dict(text="Employment Funnel (440K+ Jobs)", font=dict(size=16, color='#f3f4f6')),
+        height=400,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='#d1d5db', family='Space Grotesk'),
+        margin=dict(t=60, l=10, r=10, b=10)
+    )
+    return fig_funnel
+
+
+def tax_treemap(tax_states):
+    """State tax revenue treemap"""
+    fig_tree = go.Figure(go.Treemap(
+        labels=tax_states['state'].tolist() + ['Other States'],
+        parents=[''] * len(tax_states) + [''],
+        values=tax_states['tax_revenue_usd'].tolist() + [500_000_000],
+        textinfo='label+value',
+        texttemplate='<b>%{label}</b><br>$%{value:,.0f}',
+        marker=dict(
+            colors=['#047857', '#059669', '#10b981', '#34d399', '#6ee7b7',
+                    '#a7f3d0', '#d1fae5', '#ecfdf5', '#f0fdf4', '#fafafa', '#4b5563'],
+            line=dict(width=2, color='#1a1a2e')
+        ),
+        textfont=dict(size=12),
+        hovertemplate='<b>%{label}</b><br>Tax Revenue: $%{value:,.0f}<extra></extra>'
+    ))
+    fig_tree.update_layout(
+        title=dict(text="State Tax Revenue Treemap", font=dict(size=16, color='#f3f4f6')),
+        height=400,
+        paper_bgcolor='rgba(0,0,0,0)',
+        margin=dict(t=60, l=10, r=10, b=10),
+        font=dict(family='Space Grotesk')
+    )
+    return fig_tree
+
+
+def consumer_radar():
+    """Consumer segment analysis by generation"""
+    # Radar chart for consumer segment analysis
+    categories = ['Awareness', 'Purchase Intent', 'Price Premium', 'Brand Loyalty', 'Repeat Purchase', 'Social Share']
+    fig_radar = go.Figure()
+
+    fig_radar.add_trace(go.Scatterpolar(
+        r=[85, 72, 70, 65, 78, 82],
+        theta=categories,
+        fill='toself',
+        fillcolor='rgba(16, 185, 129, 0.2)',
+        line=dict(color='#10b981', width=2),
+        name='Gen Z (18-25)'
+    ))
+    fig_radar.add_trace(go.Scatterpolar(
+        r=[78, 68, 65, 70, 72, 68],
+        theta=categories,
+        fill='toself',
+        fillcolor='rgba(52, 211, 153, 0.15)',
+        line=dict(color='#34d399', width=2),
+        name='Millennials (26-41)'
+    ))
+    fig_radar.add_trace(go.Scatterpolar(
+        r=[64, 45, 48, 55, 58, 35],
+        theta=categories,
+        fill='toself',
+        fillcolor='rgba(110, 231, 183, 0.1)',
+        line=dict(color='#6ee7b7', width=2),
+        name='Gen X (42-57)'
+    ))
+
+    fig_radar.update_layout(
+        title=dict(text="Consumer Segment Analysis", font=dict(size=16, color='#f3f4f6')),
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 100],
+                gridcolor='rgba(255,255,255,0.1)',
+                tickfont=dict(color='#6b7280', size=10)
+            ),
+            angularaxis=dict(
+                gridcolor='rgba(255,255,255,0.1)',
+                tickfont=dict(color='#9ca3af', size=11)
+            ),
+            bgcolor='rgba(0,0,0,0)'
+        ),
+        showlegend=True,
+        legend=dict(
+            orientation='h',
+            yanchor='bottom',
+            y=-0.15,
+            xanchor='center',
+            x=0.5,
+            font=dict(color='#9ca3af', size=11)
+        ),
+        height=420,
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Space Grotesk'),
+        margin=dict(t=60, l=60, r=60, b=80)
+    )
+    return fig_radar
+
+
+def data_version(*frames):
+    """Content hash of a figure's input dataframes"""
+    digest = hashlib.sha256()
+    for df in frames:
+        digest.update("\0".join(map(str, df.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """Built figures keyed by name and the data version of their inputs.
+
+    Only the latest version of each figure is kept. Figures are shared across
+    sessions, so callers must not mutate them.
+
+    With a shared tier (caching.SharedCache), a figure missing here is loaded
+    from the JSON spec another instance built before falling back to building
+    it, and every figure built here is published there as a spec.
+    """
+
+    def __init__(self, shared=None):
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.shared = shared
+        self.builds = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.shared_misses = 0
+
+    def get(self, name, build, *frames):
+        version = data_version(*frames)
+        with self.lock:
+            entry = self.entries.get(name)
+            if entry is not None and entry['version'] == version:
+                self.hits += 1
+                return entry['figure']
+        spec = self.from_shared(name, version)
+        if spec is not None:
+            # Built and validated by a peer; skipping validation makes this ~1ms
+            fig = go.Figure(json.loads(spec), _validate=False)
+        else:
+            fig = build(*frames)
+            if self.shared is not None:
+                self.shared.put_blob(f"figure:{name}", fig.to_json().encode(), f"{SOURCE_VERSION}:{version}")
+            with self.lock:
+                self.builds += 1
+        with self.lock:
+            self.entries[name] = {'version': version, 'figure': fig}
+        return fig
+
+    def stats(self):
+        """Builds, plus hits, misses and hit rate per tier"""
+        with self.lock:
+            # Every memory miss was either served by the shared tier or built
+            tiers = {'memory': (self.hits, self.shared_hits + self.builds)}
+            if self.shared is not None:
+                tiers['shared'] = (self.shared_hits, self.shared_misses)
+            builds = self.builds
+        return {
+            'builds': builds,
+            **{
+                tier: {'hits': hits, 'misses': misses, 'hit_rate': hits / (hits + misses) if hits + misses else None}
+                for tier, (hits, misses) in tiers.items()
+            },
+        }
+
+    def from_shared(self, name, version):
+        """Spec JSON from the shared tier, or None"""
+        if self.shared is None:
+            return None
+        data = self.shared.get_blob(f"figure:{name}", f"{SOURCE_VERSION}:{version}")
+        with self.lock:
+            if data is None:
+                self.shared_misses += 1
+            else:
+                self.shared_hits += 1
+        return None if data is None else data.decode()
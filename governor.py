@@ -0,0 +1,186 @@
+"""
+Query governor
+Every warehouse query passes through one process-wide governor that bounds
+concurrency with a FIFO queue, dry-runs each new query shape to estimate the
+bytes it will scan, caps bytes billed per query and holds spend to a rolling
+hourly budget. Queries it turns away raise QueryRejected, which the caching
+layer answers with the last cached copy of the data.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Queries running against the warehouse at once, across all sessions
+MAX_CONCURRENT = int(os.environ.get("HEMP_MAX_CONCURRENT_QUERIES", 4))
+# Queries allowed to wait for a slot; more than this are rejected outright
+QUEUE_SIZE = int(os.environ.get("HEMP_QUERY_QUEUE_SIZE", 32))
+# Seconds a query waits for a slot before it is rejected; kept under the query
+# deadline (HEMP_QUERY_DEADLINE) so a full queue isn't mistaken for an outage
+QUEUE_TIMEOUT = float(os.environ.get("HEMP_QUERY_QUEUE_TIMEOUT", 10))
+# Passed to BigQuery as maximum_bytes_billed; queries estimated above it never run
+MAX_BYTES_BILLED = int(os.environ.get("HEMP_MAX_BYTES_BILLED", 1024 ** 3))
+# Bytes all queries from this process may scan in any rolling hour
+HOURLY_BYTE_BUDGET = int(os.environ.get("HEMP_HOURLY_BYTE_BUDGET", 50 * 1024 ** 3))
+# Seconds a query shape's dry-run estimate is reused before it is estimated again
+ESTIMATE_TTL = 3600
+WINDOW_SECONDS = 3600
+
+
+class QueryRejected(Exception):
+    """The governor refused to run a query"""
+
+
+class BudgetExhausted(QueryRejected):
+    """Running the query would exceed the rolling hourly byte budget"""
+
+
+class SlotQueue:
+    """Counting semaphore whose waiters are admitted first come, first served"""
+
+    def __init__(self, slots, max_waiting):
+        self.slots = slots
+        self.max_waiting = max_waiting
+        self.active = 0
+        self.waiting = deque()
+        self.lock = threading.Lock()
+
+    def acquire(self, timeout):
+        with self.lock:
+            if self.active < self.slots and not self.waiting:
+                self.active += 1
+                return
+            if len(self.waiting) >= self.max_waiting:
+                raise QueryRejected(f"query queue is full ({self.max_waiting} waiting)")
+            turn = threading.Event()
+            self.waiting.append(turn)
+        if turn.wait(timeout):
+            return
+        with self.lock:
+            if turn in self.waiting:
+                self.waiting.remove(turn)
+                raise QueryRejected(f"no query slot free after {timeout:.0f}s")
+        # A slot was handed over just as the wait timed out; keep it
+
+    def release(self):
+        with self.lock:
+            if self.waiting:
+                # Hand the slot straight to the next waiter so nobody can jump the queue
+                self.waiting.popleft().set()
+            else:
+                self.active -= 1
+
+
+class QueryGovernor:
+    """Admission control and byte accounting for warehouse queries"""
+
+    def __init__(self, max_concurrent=MAX_CONCURRENT, queue_size=QUEUE_SIZE, queue_timeout=QUEUE_TIMEOUT,
+                 max_bytes_billed=MAX_BYTES_BILLED, hourly_budget=HOURLY_BYTE_BUDGET):
+        self.slots = SlotQueue(max_concurrent, queue_size)
+        self.queue_timeout = queue_timeout
+        self.max_bytes_billed = max_bytes_billed
+        self.hourly_budget = hourly_budget
+        self.estimates = {}
+        self.spent = deque()
+        self.reserved = 0
+        self.lock = threading.Lock()
+        self.admitted = 0
+        self.rejected = 0
+        self.dry_runs = 0
+        self.wait_seconds = 0.0
+
+    def run(self, backend, sql, params, execute):
+        """Call execute(maximum_bytes_billed) once the query is admitted; returns its dataframe"""
+        started = time.perf_counter()
+        try:
+            self.slots.acquire(self.queue_timeout)
+        except QueryRejected:
+            self.count_rejection()
+            raise
+        try:
+            waited = time.perf_counter() - started
+            estimate = self.estimate(backend, sql, params)
+            self.reserve(estimate)
+            with self.lock:
+                self.admitted += 1
+                self.wait_seconds += waited
+            try:
+                df = execute(self.max_bytes_billed)
+            finally:
+                self.unreserve(estimate)
+            scanned = df.attrs.get('query_stats', {}).get('bytes_processed')
+            self.record(scanned if scanned is not None else estimate)
+            return df
+        finally:
+            self.slots.release()
+
+    def estimate(self, backend, sql, params):
+        """Bytes a query shape scans, from a dry run the first time it is seen; None if unknown"""
+        key = (backend.name, sql)
+        with self.lock:
+            cached = self.estimates.get(key)
+        if cached is not None and time.monotonic() - cached[1] < ESTIMATE_TTL:
+            return cached[0]
+        estimate = backend.dry_run(sql, params)
+        with self.lock:
+            self.dry_runs += 1
+            self.estimates[key] = (estimate, time.monotonic())
+        if estimate is not None:
+            logger.info("Dry run estimates %d bytes for a new query shape", estimate)
+        return estimate
+
+    def reserve(self, estimate):
+        """Hold an admitted query's estimate against the budget until it finishes"""
+        if estimate is None:
+            return
+        if estimate > self.max_bytes_billed:
+            self.count_rejection()
+            raise QueryRejected(f"query would scan {estimate} bytes, over the {self.max_bytes_billed} byte cap")
+        with self.lock:
+            if self.spent_last_hour() + self.reserved + estimate > self.hourly_budget:
+                self.rejected += 1
+                raise BudgetExhausted(f"hourly byte budget of {self.hourly_budget} bytes is spent")
+            self.reserved += estimate
+
+    def unreserve(self, estimate):
+        if estimate is not None:
+            with self.lock:
+                self.reserved -= estimate
+
+    def record(self, scanned):
+        """Count bytes a finished query scanned against the rolling window"""
+        if scanned:
+            with self.lock:
+                self.spent.append((time.monotonic(), scanned))
+
+    def spent_last_hour(self):
+        """Bytes scanned in the rolling window; call with the lock held"""
+        cutoff = time.monotonic() - WINDOW_SECONDS
+        while self.spent and self.spent[0][0] < cutoff:
+            self.spent.popleft()
+        return sum(scanned for _, scanned in self.spent)
+
+    def count_rejection(self):
+        with self.lock:
+            self.rejected += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                'active': self.slots.active,
+                'queued': len(self.slots.waiting),
+                'admitted': self.admitted,
+                'rejected': self.rejected,
+                'dry_runs': self.dry_runs,
+                'mean_wait_seconds': self.wait_seconds / self.admitted if self.admitted else None,
+                'bytes_last_hour': self.spent_last_hour(),
+                'bytes_reserved': self.reserved,
+                'hourly_budget': self.hourly_budget,
+            }
+
+
+# Shared by every session in the process
+query_governor = QueryGovernor()
@@ -0,0 +1,52 @@
+"""
+Running the dashboard outside a browser session
+app.py renders some sections lazily, only once their expander is open. Their
+expander keys live here, next to the helpers that run app.py headlessly, so the
+warm-up (startup.py), the static export (export.py) and the benchmark
+(benchmark.py) open the same sections the app renders. The warehouse backend is
+built here too, so every entry point reads the same tables with the same
+credentials.
+"""
+from pathlib import Path
+
+import warehouse
+
+APP = Path(__file__).parent / "app.py"
+
+# Expander keys of the sections app.py renders lazily
+CONSUMER_SECTION = "open_consumer"
+TIMELINE_SECTION = "open_timeline"
+TAKEAWAYS_SECTION = "open_takeaways"
+LAZY_SECTIONS = (CONSUMER_SECTION, TIMELINE_SECTION, TAKEAWAYS_SECTION)
+
+
+def make_backend():
+    """Backend for HEMP_DATA_BACKEND; BigQuery authenticates with the gcp_service_account secret"""
+    if warehouse.BACKEND == "local":
+        return warehouse.LocalBackend()
+    # Deferred so the local backend never pays for importing the BigQuery client
+    import streamlit as st
+    from google.cloud import bigquery
+    from google.oauth2 import service_account
+
+    credentials = service_account.Credentials.from_service_account_info(
+        dict(st.secrets["gcp_service_account"])
+    )
+    return warehouse.BigQueryBackend(bigquery.Client(credentials=credentials, project=warehouse.PROJECT_ID))
+
+
+def app_test(timeout):
+    """AppTest for app.py with every lazy section open"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(APP), default_timeout=timeout)
+    for key in LAZY_SECTIONS:
+        at.session_state[key] = True
+    return at
+
+
+def run(at):
+    """Run at once, raising if the app raised"""
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"app raised: {at.exception[0].value}")
@@ -0,0 +1,164 @@
+"""
+Resilient warehouse calls
+Every warehouse call runs under a deadline, is retried with jittered backoff
+while time remains, and passes through a circuit breaker that fails fast once
+the warehouse has failed repeatedly. Callers that get WarehouseUnavailable
+serve fallback data instead (see caching.cached_fallback), so a warehouse
+incident costs a page a bounded amount of time.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import governor
+
+logger = logging.getLogger(__name__)
+
+# Attempts per call, including the first
+MAX_ATTEMPTS = int(os.environ.get("HEMP_QUERY_ATTEMPTS", 3))
+# Backoff before retry n is uniform in [0, min(BACKOFF_CAP, BACKOFF_BASE * 2**n)) seconds
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 4.0
+# Consecutive failures that open the circuit
+FAILURE_THRESHOLD = int(os.environ.get("HEMP_BREAKER_FAILURES", 5))
+# Seconds the circuit stays open before one trial call is let through
+RESET_SECONDS = float(os.environ.get("HEMP_BREAKER_RESET_SECONDS", 30))
+
+# Attempts run here so the caller can stop waiting at its deadline; an
+# abandoned attempt finishes in the background and still holds its governor slot
+_attempts = ThreadPoolExecutor(
+    max_workers=governor.MAX_CONCURRENT + governor.QUEUE_SIZE, thread_name_prefix="warehouse-call"
+)
+
+
+class WarehouseUnavailable(Exception):
+    """The warehouse could not answer within the deadline"""
+
+
+class QueryFailed(WarehouseUnavailable):
+    """The warehouse refused the call itself (bad SQL, a byte cap, a quota), so it wasn't retried"""
+
+
+class CircuitOpen(WarehouseUnavailable):
+    """Recent calls failed, so this one was not attempted"""
+
+
+class DeadlineExceeded(TimeoutError):
+    """An attempt was still running when the call's deadline passed"""
+
+
+class CircuitBreaker:
+    """Closed while calls succeed; open (failing fast) after repeated failures.
+
+    Once RESET_SECONDS have passed, the next call is let through as a trial
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, threshold=FAILURE_THRESHOLD, reset_seconds=RESET_SECONDS):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.times_opened = 0
+        self.lock = threading.Lock()
+
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_seconds or self.trial_running:
+            return "open"
+        return "half_open"
+
+    def allow(self):
+        """Raise CircuitOpen unless a call may go ahead"""
+        with self.lock:
+            state = self.state()
+            if state == "open":
+                raise CircuitOpen(f"circuit open after {self.failures} consecutive warehouse failures")
+            if state == "half_open":
+                self.trial_running = True
+
+    def record_success(self):
+        with self.lock:
+            if self.opened_at is not None:
+                logger.info("Warehouse calls succeeding again; closing the circuit")
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.failures >= self.threshold:
+                if self.opened_at is None:
+                    logger.warning("Opening the circuit after %d consecutive warehouse failures", self.failures)
+                    self.times_opened += 1
+                # A failed trial keeps it open for another RESET_SECONDS
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """End a trial call that never reached the warehouse"""
+        with self.lock:
+            self.trial_running = False
+
+    def stats(self):
+        with self.lock:
+            return {'state': self.state(), 'consecutive_failures': self.failures, 'times_opened': self.times_opened}
+
+
+# Shared by every session in the process. Metadata checks get their own, so a
+# warehouse that answers them but not queries still opens the query circuit.
+breaker = CircuitBreaker()
+metadata_breaker = CircuitBreaker()
+
+
+def retryable(error):
+    """Whether an error may go away on retry; client errors (a bad query, a byte cap) won't"""
+    code = getattr(error, 'code', None)
+    return not (isinstance(code, int) and 400 <= code < 500 and code not in (408, 429))
+
+
+def backoff(attempt):
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def call(fn, deadline, attempts=MAX_ATTEMPTS, breaker=breaker):
+    """Return fn(seconds_remaining), retrying failures until deadline seconds have passed.
+
+    Raises WarehouseUnavailable when the circuit is open or no attempt
+    succeeded in time, and QueryFailed, without retrying, for errors that
+    retrying can't fix. Those and queries the governor turned away (raised as
+    they are) don't count as failures.
+    """
+    give_up_at = time.monotonic() + deadline
+    for attempt in range(attempts):
+        breaker.allow()
+        remaining = give_up_at - time.monotonic()
+        try:
+            future = _attempts.submit(fn, remaining)
+            try:
+                result = future.result(timeout=remaining)
+            except FutureTimeout:
+                raise DeadlineExceeded(f"no answer within {deadline:.0f}s") from None
+        except governor.QueryRejected:
+            breaker.release()
+            raise
+        except Exception as error:
+            if not retryable(error):
+                # The warehouse answered; the request itself was at fault
+                breaker.record_success()
+                raise QueryFailed(f"{type(error).__name__}: {error}") from error
+            breaker.record_failure()
+            delay = backoff(attempt)
+            if attempt + 1 == attempts or time.monotonic() + delay >= give_up_at:
+                raise WarehouseUnavailable(f"{type(error).__name__}: {error}") from error
+            logger.warning("Warehouse call failed (%s); retrying in %.2fs", error, delay)
+            time.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
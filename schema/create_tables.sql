@@ -1,5 +1,12 @@
 -- Hemp Advocacy Dashboard - BigQuery Schema
 -- Dataset: hemp_advocacy (isolated for potential public sharing)
+--
+-- Tables with a year column are range-partitioned one partition per year and
+-- the timeline is partitioned by event year, so queries filtering on year or
+-- event_date only scan the partitions they need. Clustering sorts each
+-- partition by the columns the dashboard filters on (state, hemp_type,
+-- geography, ...). Partitioning can't be added to an existing table: recreate
+-- it (CREATE TABLE ... PARTITION BY ... AS SELECT * FROM old) to migrate.
 
 -- 1. USDA Hemp Production by State and Year
 CREATE TABLE IF NOT EXISTS `artful-logic-475116-p1.hemp_advocacy.production_by_state` (
@@ -13,8 +20,11 @@ CREATE TABLE IF NOT EXISTS `artful-logic-475116-p1.hemp_advocacy.production_by_s
   num_operations INT64,
   hemp_type STRING,  -- 'floral', 'grain', 'fiber', 'seed'
   source STRING,
+  row_hash STRING,  -- content hash written by load_data.py sync
   last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP()
-);
+)
+PARTITION BY RANGE_BUCKET(year, GENERATE_ARRAY(2000, 2051, 1))
+CLUSTER BY state, hemp_type;
 
 -- 2. National Market Metrics Over Time
 CREATE TABLE IF NOT EXISTS `artful-logic-475116-p1.hemp_advocacy.market_metrics` (
@@ -25,8 +35,11 @@ CREATE TABLE IF NOT EXISTS `artful-logic-475116-p1.hemp_advocacy.market_metrics`
   category STRING,  -- 'market_size', 'growth_rate', 'projection'
   source STRING,
   notes STRING,
+  row_hash STRING,  -- content hash written by load_data.py sync
   last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP()
-);
+)
+PARTITION BY RANGE_BUCKET(year, GENERATE_ARRAY(2000, 2051, 1))
+CLUSTER BY metric_name, category;
 
 -- 3. Employment Statistics
 CREATE TABLE IF NOT EXISTS `artful-logic-475116-p1.hemp_advocacy.employment_stats` (
@@ -37,8 +50,11 @@ CREATE TABLE IF NOT EXISTS `artful-logic-475116-p1.hemp_advocacy.employment_stat
   total_wages_usd INT64,
   sector STRING,  -- 'cultivation', 'processing', 'retail', 'all'
   source STRING,
+  row_hash STRING,  -- content hash written by load_data.py sync
   last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP()
-);
+)
+PARTITION BY RANGE_BUCKET(year, GENERATE_ARRAY(2000, 2051, 1))
+CLUSTER BY geography, sector;
 
 -- 4. State Regulatory Status
 CREATE TABLE IF NOT EXISTS `artful-logic-475116-p1.hemp_advocacy.regulatory_status` (
@@ -50,8 +66,10 @@ CREATE TABLE IF NOT EXISTS `artful-logic-475116-p1.hemp_advocacy.regulatory_stat
   effective_date DATE,
   notes STRING,
   source STRING,
+  row_hash STRING,  -- content hash written by load_data.py sync
   last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP()
-);
+)
+CLUSTER BY state;
 
 -- 5. Consumer Trends & Demand Indicators
 CREATE TABLE IF NOT EXISTS `artful-logic-475116-p1.hemp_advocacy.consumer_trends` (
@@ -61,8 +79,11 @@ CREATE TABLE IF NOT EXISTS `artful-logic-475116-p1.hemp_advocacy.consumer_trends
   unit STRING,
   demographic STRING,  -- 'all', 'millennials', 'gen_z', etc.
   source STRING,
+  row_hash STRING,  -- content hash written by load_data.py sync
   last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP()
-);
+)
+PARTITION BY RANGE_BUCKET(year, GENERATE_ARRAY(2000, 2051, 1))
+CLUSTER BY metric_name, demographic;
 
 -- 6. Tax Revenue by State (Cannabis/Hemp Combined where available)
 CREATE TABLE IF NOT EXISTS `artful-logic-475116-p1.hemp_advocacy.tax_revenue` (
@@ -72,8 +93,11 @@ CREATE TABLE IF NOT EXISTS `artful-logic-475116-p1.hemp_advocacy.tax_revenue` (
   tax_revenue_usd INT64,
   pct_of_state_revenue FLOAT64,
   source STRING,
+  row_hash STRING,  -- content hash written by load_data.py sync
   last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP()
-);
+)
+PARTITION BY RANGE_BUCKET(year, GENERATE_ARRAY(2000, 2051, 1))
+CLUSTER BY state, quarter;
 
 -- 7. Timeline / Milestones
 CREATE TABLE IF NOT EXISTS `artful-logic-475116-p1.hemp_advocacy.industry_timeline` (
@@ -82,5 +106,8 @@ CREATE TABLE IF NOT EXISTS `artful-logic-475116-p1.hemp_advocacy.industry_timeli
   title STRING NOT NULL,
   description STRING,
   impact STRING,  -- 'positive', 'negative', 'neutral'
-  source STRING
-);
+  source STRING,
+  row_hash STRING  -- content hash written by load_data.py sync
+)
+PARTITION BY DATE_TRUNC(event_date, YEAR)
+CLUSTER BY event_type, impact;
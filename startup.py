@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Container entrypoint: warm the process, then start Streamlit
+Imports the heavy modules and runs app.py once headlessly, with every section
+open, so the data, summary and figure caches are filled before the server
+binds its port. /_stcore/health (and Cloud Run's startup probe) only pass once
+that is done, so the first visitor lands on a warm process. The time each
+stage took is logged as one JSON line and shown in the diagnostics panel, to
+track time-to-ready per deploy.
+
+    python startup.py --server.port=8080 --server.address=0.0.0.0
+
+Arguments are passed through to `streamlit run app.py`.
+"""
+import importlib
+import os
+import sys
+import time
+from pathlib import Path
+
+started = time.perf_counter()
+
+ROOT = Path(__file__).parent
+APP = ROOT / "app.py"
+
+# Third-party modules timed separately, slowest first in a typical profile
+HEAVY_MODULES = ("streamlit", "pandas", "pyarrow", "plotly.graph_objects")
+APP_MODULES = ("telemetry", "governor", "resilience", "warehouse", "headless", "caching", "figures", "timeline")
+# Set to 0 to start serving without the warm-up run
+PREWARM = os.environ.get("HEMP_PREWARM", "1") != "0"
+# A warm-up slower than this is abandoned; the first visitor loads the data instead
+PREWARM_TIMEOUT = int(os.environ.get("HEMP_PREWARM_TIMEOUT", 300))
+# Streamlit releases the warm-up is known to work with, [first, last). It clears
+# Runtime._instance, which is private; outside this range the server starts cold.
+PREWARM_STREAMLIT = ((1, 55), (2, 0))
+
+
+def driver_module():
+    """Client library for the configured backend; app.py imports it on first use"""
+    return "duckdb" if os.environ.get("HEMP_DATA_BACKEND", "bigquery") == "local" else "google.cloud.bigquery"
+
+
+def timed_imports(names):
+    """Seconds to import each module; shared dependencies count toward the first that pulls them in"""
+    seconds = {}
+    for name in names:
+        began = time.perf_counter()
+        importlib.import_module(name)
+        seconds[name] = time.perf_counter() - began
+    return seconds
+
+
+def prewarm_unsupported():
+    """Why the warm-up can't run on the installed Streamlit, or None if it can"""
+    import streamlit
+    from streamlit.runtime import Runtime
+
+    installed = tuple(int(part) for part in streamlit.__version__.split(".")[:2])
+    first, last = PREWARM_STREAMLIT
+    if not first <= installed < last or not hasattr(Runtime, "_instance"):
+        return f"untested streamlit {streamlit.__version__}"
+    return None
+
+
+def load_server_config(argv):
+    """Apply the server flags the way `streamlit run` will, before the warm-up parses the config.
+
+    Otherwise the server's own parse sees its [server] options change since the
+    warm-up and logs that streamlit needs a restart, though the flags do apply.
+    """
+    from streamlit.web import bootstrap, cli
+
+    params = cli.main_run.make_context("run", [str(APP), *argv]).params
+    bootstrap.load_config_options({name: value for name, value in params.items() if name not in ("target", "args")})
+
+
+def prewarm():
+    """Run app.py once in this process, filling its st.cache_* caches; returns its paint times"""
+    from streamlit.runtime import Runtime
+
+    import headless
+
+    at = headless.app_test(timeout=PREWARM_TIMEOUT)
+    try:
+        headless.run(at)
+    finally:
+        # AppTest installs a stand-in Runtime; the server creates the real one
+        Runtime._instance = None
+    return at.session_state['paint_times'] if 'paint_times' in at.session_state else {}
+
+
+def main():
+    imports = timed_imports([*HEAVY_MODULES, driver_module(), *APP_MODULES])
+    import telemetry
+
+    # Before the warm-up, so its fetch and paint timings are logged too
+    telemetry.configure_logging()
+
+    report = {
+        'revision': os.environ.get("K_REVISION"),
+        'import_seconds': sum(imports.values()),
+        'imports': imports,
+    }
+    skipped = PREWARM and prewarm_unsupported()
+    if skipped:
+        report['prewarm_error'] = skipped
+    elif PREWARM:
+        began = time.perf_counter()
+        try:
+            load_server_config(sys.argv[1:])
+            report['prewarm_paint_times'] = prewarm()
+        except Exception as error:
+            report['prewarm_error'] = str(error)
+        report['prewarm_seconds'] = time.perf_counter() - began
+    report['ready_seconds'] = time.perf_counter() - started
+
+    # Logs the report as one JSON line
+    telemetry.record_startup(report)
+
+    from streamlit.web import cli
+
+    sys.argv = ["streamlit", "run", str(APP), *sys.argv[1:]]
+    return cli.main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
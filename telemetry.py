@@ -0,0 +1,119 @@
+"""
+Per-query and startup telemetry
+Every warehouse query is emitted as one structured (JSON) log line and kept in
+a bounded in-process ring buffer, which the admin diagnostics panel aggregates.
+The time-to-ready breakdown recorded by startup.py is kept alongside it.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Queries kept in memory for the diagnostics panel
+BUFFER_SIZE = int(os.environ.get("HEMP_TELEMETRY_BUFFER", 1000))
+# Level for the app's own loggers; Streamlit only configures its own, so
+# without this their INFO timings would be dropped
+LOG_LEVEL = os.environ.get("HEMP_LOG_LEVEL", "INFO").upper()
+# app.py runs as __main__ under `streamlit run`
+APP_LOGGERS = ("__main__", "caching", "figures", "governor", "resilience", "startup",
+               "telemetry", "timeline", "warehouse")
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+# Query records are logged as bare JSON lines so log collectors parse them as structured entries
+JSON_LOGGERS = ("telemetry",)
+
+# Stats a backend reports per query; None where the backend can't measure it
+#   queue_seconds:     created -> started (BigQuery scheduling)
+#   execution_seconds: started -> ended
+#   download_seconds:  fetching and converting the result to a dataframe
+#   bytes_processed, cache_hit, slot_ms: from the BigQuery job
+#   rows:              rows returned
+STAT_FIELDS = ('queue_seconds', 'execution_seconds', 'download_seconds',
+               'bytes_processed', 'cache_hit', 'slot_ms', 'rows')
+_TIMED = ('seconds', 'queue_seconds', 'execution_seconds', 'download_seconds', 'bytes_processed', 'slot_ms', 'rows')
+
+
+class QueryLog:
+    """Ring buffer of the most recent query records, shared by every session"""
+
+    def __init__(self, size=BUFFER_SIZE):
+        self.records = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def record(self, label, backend, tables, seconds, stats):
+        entry = {
+            'at': time.time(),
+            'label': label,
+            'backend': backend,
+            'tables': list(tables),
+            'seconds': seconds,
+            **{field: stats.get(field) for field in STAT_FIELDS},
+        }
+        with self.lock:
+            self.records.append(entry)
+        logger.info(json.dumps({'event': 'query', **entry}))
+        return entry
+
+    def frame(self):
+        with self.lock:
+            records = list(self.records)
+        return pd.DataFrame.from_records(records, columns=['at', 'label', 'backend', 'tables', 'seconds', *STAT_FIELDS])
+
+    def summary(self):
+        """Count, p50 and p95 of each stat per query label, plus the result cache hit rate"""
+        df = self.frame()
+        if df.empty:
+            return pd.DataFrame()
+        for column in _TIMED:
+            df[column] = pd.to_numeric(df[column], errors='coerce')
+        df['cache_hit'] = df['cache_hit'].map({True: 1.0, False: 0.0})
+        grouped = df.groupby('label')
+        summary = pd.DataFrame({
+            'queries': grouped.size(),
+            'tables': grouped['tables'].first().map(", ".join),
+        })
+        for column in _TIMED:
+            summary[f'{column}_p50'] = grouped[column].quantile(0.5)
+            summary[f'{column}_p95'] = grouped[column].quantile(0.95)
+        summary['cache_hit_rate'] = grouped['cache_hit'].mean()
+        return summary
+
+
+query_log = QueryLog()
+
+_logging_configured = False
+_logging_lock = threading.Lock()
+
+
+def configure_logging(level=LOG_LEVEL):
+    """Send the app's log records to stderr at level; safe to call on every rerun"""
+    global _logging_configured
+    with _logging_lock:
+        if _logging_configured:
+            return
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        json_handler = logging.StreamHandler()
+        json_handler.setFormatter(logging.Formatter("%(message)s"))
+        for name in APP_LOGGERS:
+            app_logger = logging.getLogger(name)
+            app_logger.setLevel(level)
+            app_logger.addHandler(json_handler if name in JSON_LOGGERS else handler)
+            # Don't print twice if the host also configures the root logger
+            app_logger.propagate = False
+        _logging_configured = True
+
+
+# Seconds per startup stage for this process, filled in by startup.py; empty
+# when the app was started with plain `streamlit run`
+startup = {}
+
+
+def record_startup(report):
+    startup.update(report)
+    logger.info(json.dumps({'event': 'startup', **report}))
@@ -0,0 +1,55 @@
+"""
+Industry timeline rendering
+Builds the HTML for a whole window of events in one pass so the timeline is a
+single Streamlit element regardless of how many events it holds
+"""
+import html
+
+import pandas as pd
+
+IMPACT_COLORS = {'positive': '#10b981', 'negative': '#ef4444', 'neutral': '#6b7280'}
+DEFAULT_COLOR = '#6b7280'
+PAGE_SIZE = 25
+
+
+def filter_events(df, event_types=None, impacts=None, start=None, end=None):
+    """Events matching the selected types, impacts and inclusive date range"""
+    dates = pd.to_datetime(df['event_date'])
+    mask = pd.Series(True, index=df.index)
+    if event_types:
+        mask &= df['event_type'].isin(event_types)
+    if impacts:
+        mask &= df['impact'].isin(impacts)
+    if start is not None:
+        mask &= dates >= pd.Timestamp(start)
+    if end is not None:
+        mask &= dates <= pd.Timestamp(end)
+    return df[mask]
+
+
+def page_count(df, page_size=PAGE_SIZE):
+    return max(1, -(-len(df) // page_size))
+
+
+def page(df, number, page_size=PAGE_SIZE):
+    """Rows for a 1-based page number"""
+    start = (number - 1) * page_size
+    return df.iloc[start:start + page_size]
+
+
+def render_html(df):
+    """HTML for every event in df, built column-wise rather than row by row"""
+    if df.empty:
+        return "<p class='source-citation'>No events match the selected filters.</p>"
+    # Columns may arrive as categoricals (see caching.compact); map on plain values
+    colors = df['impact'].astype(object).map(IMPACT_COLORS).fillna(DEFAULT_COLOR)
+    dates = pd.to_datetime(df['event_date']).dt.strftime("%b %Y")
+    titles = df['title'].astype(object).fillna("").map(html.escape)
+    descriptions = df['description'].astype(object).fillna("").map(html.escape)
+    items = (
+        '<div class="timeline-item" style="border-left: 3px solid ' + colors + ';">'
+        + '<div class="timeline-date">' + dates + '</div>'
+        + '<div><div class="timeline-title">' + titles + '</div>'
+        + '<div class="timeline-desc">' + descriptions + '</div></div></div>'
+    )
+    return "".join(items)
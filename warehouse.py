@@ -0,0 +1,416 @@
+"""
+Query backends for the dashboard
+BigQuery in production, or an embedded DuckDB copy of the seed data for
+offline runs, tests and benchmarks (HEMP_DATA_BACKEND=local)
+"""
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+import governor
+import resilience
+import telemetry
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ID = "artful-logic-475116-p1"
+DATASET_ID = "hemp_advocacy"
+
+# 'bigquery' or 'local'
+BACKEND = os.environ.get("HEMP_DATA_BACKEND", "bigquery")
+# DuckDB database file for the local backend; in-memory by default
+LOCAL_DB_PATH = os.environ.get("HEMP_LOCAL_DB", ":memory:")
+
+SCHEMA_PATH = Path(__file__).parent / "schema" / "create_tables.sql"
+
+# 'concurrent' runs one job per chart query; 'batched' pulls all of them in one job
+FETCH_MODE = os.environ.get("HEMP_FETCH_MODE", "concurrent")
+
+# Earliest year the dashboard reads. Queries on year-partitioned tables filter
+# on it so BigQuery prunes older partitions rather than scanning all history
+HISTORY_START_YEAR = int(os.environ.get("HEMP_HISTORY_START_YEAR", 2014))
+
+# What each dashboard visualization draws, pushed down into SQL so only those
+# columns and rows are scanned and shipped. Fetched together by load_all_data().
+#   columns:  projection
+#   filters:  (column, operator, value) triples, bound as query parameters
+#   order_by: ORDER BY clause
+#   limit:    top-N
+CHART_QUERIES = {
+    # Choropleth map and status counts
+    'regulatory': {
+        'table': 'regulatory_status',
+        'columns': ('state', 'thc_beverage_status'),
+        'order_by': 'state',
+    },
+    # State tax revenue treemap: top 10 states for Q4 2023
+    'tax': {
+        'table': 'tax_revenue',
+        'columns': ('state', 'tax_revenue_usd'),
+        'filters': (('state', '!=', 'US'), ('year', '=', 2023), ('quarter', '=', 4)),
+        'order_by': 'tax_revenue_usd DESC',
+        'limit': 10,
+    },
+    # Industry timeline
+    'timeline': {
+        'table': 'industry_timeline',
+        'columns': ('event_date', 'event_type', 'title', 'description', 'impact'),
+        'filters': (('event_date', '>=', date(HISTORY_START_YEAR, 1, 1)),),
+        'order_by': 'event_date',
+    },
+}
+
+_OPERATORS = {'=', '!=', '<', '<=', '>', '>='}
+
+
+def table_ref(table):
+    return f"`{PROJECT_ID}.{DATASET_ID}.{table}`"
+
+
+def where_clause(name, spec):
+    """WHERE clause for a spec's filters, with parameters named after the spec"""
+    conditions, params = [], {}
+    for i, (column, operator, value) in enumerate(spec.get('filters', ())):
+        if operator not in _OPERATORS:
+            raise ValueError(f"Unsupported operator {operator!r} in {name} query")
+        param = f"{name}_{i}"
+        conditions.append(f"{column} {operator} @{param}")
+        params[param] = value
+    return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+
+def build_query(name, spec):
+    """Parameterized SQL for a chart spec; returns (sql, params)"""
+    where, params = where_clause(name, spec)
+    sql = f"SELECT {', '.join(spec['columns'])} FROM {table_ref(spec['table'])}{where}"
+    if spec.get('order_by'):
+        sql += f" ORDER BY {spec['order_by']}"
+    if spec.get('limit'):
+        sql += f" LIMIT {int(spec['limit'])}"
+    return sql, params
+
+
+DASHBOARD_QUERIES = {name: build_query(name, spec) for name, spec in CHART_QUERIES.items()}
+
+
+def _latest(column, table, where, offset=0):
+    """Scalar subquery for a column's value in the latest (or offset-th latest) year.
+
+    where should leave one row per year; if it doesn't, the largest value wins
+    rather than whichever row the engine returns first.
+    """
+    skip = f" OFFSET {offset}" if offset else ""
+    return (f"(SELECT {column} FROM {table_ref(table)} WHERE year >= @history_start_year AND {where} "
+            f"ORDER BY year DESC, {column} DESC LIMIT 1{skip})")
+
+
+# US tax revenue per complete year: the annual row where there is one, otherwise
+# the sum of four quarters, so a year with only Q1 reported isn't shown as a total
+_US_TAX_YEARS = f"""(SELECT year,
+    COALESCE(MAX(CASE WHEN quarter IS NULL THEN tax_revenue_usd END), SUM(tax_revenue_usd)) AS tax_revenue_usd
+  FROM {table_ref('tax_revenue')}
+  WHERE state = 'US' AND year >= @history_start_year
+  GROUP BY year
+  HAVING MAX(CASE WHEN quarter IS NULL THEN 1 ELSE 0 END) = 1 OR COUNT(DISTINCT quarter) = 4)"""
+
+
+def _latest_tax(column):
+    return f"(SELECT {column} FROM {_US_TAX_YEARS} ORDER BY year DESC LIMIT 1)"
+
+
+# Headline numbers for the hero cards, Key Stats and consumer stat cards, as a
+# single row of scalars so the top of the page doesn't wait on the chart queries
+SUMMARY_TABLES = ('market_metrics', 'production_by_state', 'employment_stats',
+                  'tax_revenue', 'regulatory_status', 'consumer_trends')
+SUMMARY_PARAMS = {
+    'history_start_year': HISTORY_START_YEAR,
+    'production_metric': 'US Hemp Production Value',
+    'awareness_metric': 'CBD Awareness Rate',
+    'beverage_growth_metric': 'CBD Beverage Sales Growth',
+    'premium_metric': 'Willingness to Pay Premium for Traceable Products',
+    # Industry-wide job counts; the other sectors are subsets of it
+    'jobs_sector': 'cannabis_all',
+}
+# Reported values only; the generated data also carries projections under the same name
+_production_value = "metric_name = @production_metric AND category = 'market_size'"
+_acres = "state = 'US' AND hemp_type = 'all'"
+_jobs = "geography = 'US' AND sector = @jobs_sector AND total_jobs IS NOT NULL"
+SUMMARY_QUERY = f"""SELECT
+  {_latest('value', 'market_metrics', _production_value)} AS production_value_usd,
+  {_latest('value', 'market_metrics', _production_value, offset=1)} AS production_value_prior_usd,
+  {_latest('year', 'market_metrics', _production_value)} AS production_year,
+  {_latest('planted_acres', 'production_by_state', _acres)} AS planted_acres,
+  {_latest('planted_acres', 'production_by_state', _acres, offset=1)} AS planted_acres_prior,
+  {_latest('total_jobs', 'employment_stats', _jobs)} AS total_jobs,
+  {_latest('job_growth_pct', 'employment_stats', _jobs)} AS job_growth_pct,
+  {_latest_tax('tax_revenue_usd')} AS tax_revenue_usd,
+  {_latest_tax('year')} AS tax_year,
+  (SELECT SUM(CASE WHEN thc_beverage_status = 'legal' THEN 1 ELSE 0 END) FROM {table_ref('regulatory_status')}) AS states_legal,
+  (SELECT MIN(age_restriction) FROM {table_ref('regulatory_status')}) AS min_age,
+  (SELECT MAX(age_restriction) FROM {table_ref('regulatory_status')}) AS max_age,
+  {_latest('value', 'consumer_trends', 'metric_name = @awareness_metric')} AS awareness_pct,
+  {_latest('value', 'consumer_trends', 'metric_name = @beverage_growth_metric')} AS beverage_growth_pct,
+  {_latest('year', 'consumer_trends', 'metric_name = @beverage_growth_metric')} AS beverage_growth_year,
+  {_latest('value', 'consumer_trends', 'metric_name = @premium_metric')} AS premium_pct"""
+
+# Seconds each query may take, retries included, before the page falls back
+# to cached or seed data (see resilience.py)
+DEFAULT_QUERY_TIMEOUT = float(os.environ.get("HEMP_QUERY_DEADLINE", 30))
+
+# BigQuery -> DuckDB dialect rewrites, applied to DDL and queries
+_TABLE_REF = re.compile(r"`[\w-]+\.[\w-]+\.(\w+)`")
+_PARAM = re.compile(r"@(\w+)")
+_TABLE_OPTIONS = re.compile(r"\)\s*(?:PARTITION|CLUSTER)\s+BY\b.*$", re.DOTALL)
+_TYPE_REWRITES = [
+    (re.compile(r"\bINT64\b"), "BIGINT"),
+    (re.compile(r"\bFLOAT64\b"), "DOUBLE"),
+    (re.compile(r"\bSTRING\b"), "VARCHAR"),
+    (re.compile(r"CURRENT_TIMESTAMP\(\)"), "CURRENT_TIMESTAMP"),
+]
+
+
+_BQ_TYPES = {bool: "BOOL", int: "INT64", float: "FLOAT64", str: "STRING", date: "DATE"}
+
+
+class BigQueryBackend:
+    name = "bigquery"
+
+    def __init__(self, client):
+        self.client = client
+
+    def job_config(self, params=None, **options):
+        # Imported here, not at module level: it is the slowest import at startup
+        # and the local backend never needs it
+        from google.cloud import bigquery
+
+        return bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ScalarQueryParameter(name, _BQ_TYPES[type(value)], value)
+            for name, value in (params or {}).items()
+        ], **options)
+
+    def query(self, sql, timeout=None, params=None, maximum_bytes_billed=None):
+        job_config = self.job_config(params, maximum_bytes_billed=maximum_bytes_billed)
+        job = self.client.query(sql, job_config=job_config, timeout=timeout)
+        rows = job.result(timeout=timeout)
+        finished = time.perf_counter()
+        df = rows.to_dataframe()
+        df.attrs['query_stats'] = {
+            'queue_seconds': _seconds_between(job.created, job.started),
+            'execution_seconds': _seconds_between(job.started, job.ended),
+            'download_seconds': time.perf_counter() - finished,
+            'bytes_processed': job.total_bytes_processed,
+            'cache_hit': job.cache_hit,
+            'slot_ms': job.slot_millis,
+            'rows': len(df),
+        }
+        return df
+
+    def dry_run(self, sql, params=None):
+        """Bytes a query would scan, after partition pruning; dry runs are free"""
+        job = self.client.query(sql, job_config=self.job_config(params, dry_run=True, use_query_cache=False))
+        return job.total_bytes_processed
+
+    def table_versions(self, tables):
+        """Cheap change markers from table metadata; get_table() is not billed"""
+        with ThreadPoolExecutor(max_workers=len(tables)) as pool:
+            metadata = list(pool.map(
+                lambda table: self.client.get_table(f"{PROJECT_ID}.{DATASET_ID}.{table}"), tables
+            ))
+        versions = {}
+        for table, meta in zip(tables, metadata):
+            # Rows still in the streaming buffer don't bump last_modified_time
+            buffered = meta.streaming_buffer.estimated_rows if meta.streaming_buffer else 0
+            versions[table] = f"{meta.modified.isoformat()}:{meta.num_rows}:{buffered}"
+        return versions
+
+
+class LocalBackend:
+    """DuckDB database built from schema/create_tables.sql and data/seed_data.py"""
+    name = "local"
+
+    def __init__(self, path=LOCAL_DB_PATH):
+        import duckdb
+
+        self.conn = duckdb.connect(path)
+        self.in_memory = path == ":memory:"
+        if not self.conn.execute("SELECT count(*) FROM information_schema.tables").fetchone()[0]:
+            self.create_schema()
+            from data.seed_data import table_rows
+            for table, rows in table_rows().items():
+                self.insert(table, pd.DataFrame(rows))
+
+    def create_schema(self):
+        for statement in to_duckdb_ddl(SCHEMA_PATH.read_text()):
+            self.conn.execute(statement)
+
+    def insert(self, table, df):
+        """Append a dataframe to a table, matching columns by name"""
+        columns = ", ".join(df.columns)
+        cursor = self.conn.cursor()
+        cursor.register("incoming", df)
+        cursor.execute(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM incoming")
+        cursor.unregister("incoming")
+
+    def table_versions(self, tables):
+        """Row count plus MAX(last_updated) where the table has that column
+
+        An in-memory database is rebuilt from the seed data in every process, and
+        the rebuild stamps last_updated with the current time, so there only the
+        row count is used; the seed data is part of the code, like the app itself.
+        """
+        cursor = self.conn.cursor()
+        versions = {}
+        for table in tables:
+            has_last_updated = not self.in_memory and cursor.execute(
+                "SELECT count(*) FROM information_schema.columns WHERE table_name = ? AND column_name = 'last_updated'",
+                [table],
+            ).fetchone()[0]
+            marker = "max(last_updated)" if has_last_updated else "NULL"
+            count, last_updated = cursor.execute(f"SELECT count(*), {marker} FROM {table}").fetchone()
+            versions[table] = f"{last_updated}:{count}"
+        return versions
+
+    def dry_run(self, sql, params=None):
+        """DuckDB doesn't bill by bytes scanned, so there is nothing to estimate"""
+        return None
+
+    def query(self, sql, timeout=None, params=None, maximum_bytes_billed=None):
+        sql = _PARAM.sub(r"$\1", _TABLE_REF.sub(r"\1", sql))
+        started = time.perf_counter()
+        # Cursors are independent connections, so concurrent fetches don't share state
+        result = self.conn.cursor().execute(sql, params or {})
+        executed = time.perf_counter()
+        df = result.df()
+        df.attrs['query_stats'] = {
+            'queue_seconds': 0.0,
+            'execution_seconds': executed - started,
+            'download_seconds': time.perf_counter() - executed,
+            'rows': len(df),
+        }
+        return df
+
+
+def _seconds_between(start, end):
+    return (end - start).total_seconds() if start and end else None
+
+
+def to_duckdb_ddl(script):
+    """Split a BigQuery DDL script into DuckDB statements, dropping table options
+    (PARTITION BY / CLUSTER BY) DuckDB has no equivalent for"""
+    script = re.sub(r"--[^\n]*", "", script)
+    statements = []
+    for statement in script.split(";"):
+        statement = _TABLE_REF.sub(r"\1", statement.strip())
+        if not statement:
+            continue
+        statement = _TABLE_OPTIONS.sub(")", statement)
+        for pattern, replacement in _TYPE_REWRITES:
+            statement = pattern.sub(replacement, statement)
+        statements.append(statement)
+    return statements
+
+
+def run_query(backend, query, timeout=None, params=None, label=None):
+    """Run a query and return (dataframe, wall-clock seconds)
+
+    The query runs once the governor admits it, retried within a deadline of
+    timeout seconds (DEFAULT_QUERY_TIMEOUT if None), and is recorded in
+    telemetry.query_log under label, which defaults to the tables it reads.
+    Raises governor.QueryRejected if it is turned away and
+    resilience.WarehouseUnavailable if it can't be answered in time.
+    """
+    def attempt(remaining):
+        return governor.query_governor.run(backend, query, params, lambda maximum_bytes_billed: backend.query(
+            query, timeout=remaining, params=params, maximum_bytes_billed=maximum_bytes_billed
+        ))
+
+    started = time.perf_counter()
+    df = resilience.call(attempt, timeout or DEFAULT_QUERY_TIMEOUT)
+    seconds = time.perf_counter() - started
+    tables = sorted(set(_TABLE_REF.findall(query)))
+    telemetry.query_log.record(
+        label or ",".join(tables), backend.name, tables, seconds, df.attrs.get('query_stats', {})
+    )
+    return df, seconds
+
+
+_seed_backend = None
+_seed_lock = threading.Lock()
+
+
+def seed_query(query, params=None):
+    """Run a query against an in-memory copy of data/seed_data.py, for when the warehouse is out of reach"""
+    global _seed_backend
+    with _seed_lock:
+        if _seed_backend is None:
+            _seed_backend = LocalBackend(":memory:")
+    return _seed_backend.query(query, params=params)
+
+
+def bytes_scanned(df):
+    """Bytes the backend reported scanning for a freshly queried dataframe, if known"""
+    return df.attrs.get('query_stats', {}).get('bytes_processed')
+
+
+def fmt_bytes(n):
+    if n is None:
+        return "n/a"
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024:
+            return f"{n:.0f}{unit}"
+        n /= 1024
+    return f"{n:.1f}TB"
+
+
+def snapshot_query(specs=CHART_QUERIES):
+    """One query returning a single row with each chart's rows as an ARRAY<STRUCT> column.
+
+    Returns (sql, params).
+    """
+    columns, params = [], {}
+    for name, spec in specs.items():
+        sql, spec_params = build_query(name, spec)
+        params.update(spec_params)
+        # The subquery applies the top-N; ordering has to be restated for the aggregate
+        order_by = f" ORDER BY {spec['order_by']}" if spec.get('order_by') else ""
+        columns.append(f"  (SELECT ARRAY_AGG(t{order_by}) FROM ({sql}) t) AS {name}")
+    return "SELECT\n" + ",\n".join(columns), params
+
+
+def fetch_snapshot(backend, specs=CHART_QUERIES):
+    """Fetch every chart's rows in a single job and split them back into per-chart dataframes.
+
+    Returns (data, timings), with only a 'total' timing since the queries
+    share one job.
+    """
+    sql, params = snapshot_query(specs)
+    snapshot, seconds = run_query(backend, sql, DEFAULT_QUERY_TIMEOUT, params, label='snapshot')
+    row = snapshot.iloc[0]
+    data = {}
+    for name, spec in specs.items():
+        records = row[name]
+        data[name] = pd.DataFrame.from_records(
+            list(records) if records is not None else [], columns=list(spec['columns'])
+        )
+    logger.info(
+        "Fetched %d chart queries from %s in one job in %.2fs, scanning %s",
+        len(specs), backend.name, seconds, fmt_bytes(bytes_scanned(snapshot)),
+    )
+    return data, {'total': seconds}
+
+
+if __name__ == "__main__":
+    from google.cloud import bigquery
+
+    # Dry-run every dashboard query to check how much partition pruning saves
+    backend = BigQueryBackend(bigquery.Client(project=PROJECT_ID))
+    queries = {**DASHBOARD_QUERIES, 'summary': (SUMMARY_QUERY, SUMMARY_PARAMS), 'batched': snapshot_query()}
+    for name, (sql, params) in queries.items():
+        print(f"{name:<12} {fmt_bytes(backend.dry_run(sql, params)):>10}")